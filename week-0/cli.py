@@ -13,18 +13,26 @@ Usage:
 
     # Without GitHub auth:
     python cli.py https://github.com/psf/requests --no-token
+
+    # Bypass the on-disk cache of GitHub content and summaries:
+    python cli.py https://github.com/psf/requests --no-cache
 """
 
 from __future__ import annotations
 
 import argparse
 import asyncio
-import json
 import logging
 import os
+import sys
 from pathlib import Path
 
+import orjson
+
+from summary.agent import RepoAnalyzer
+from summary.cache import DiskCache
 from summary.github import GitHubClient
+from summary.llm import create_llm_client
 
 DEFAULT_TOKEN_FILE = Path("~/.ssh/github_token").expanduser()
 
@@ -76,13 +84,15 @@ async def run_readme(url: str, github: GitHubClient) -> None:
     print(content)
 
 
-async def run_analysis(url: str, github: GitHubClient, provider: str | None) -> None:
+async def run_analysis(
+    url: str,
+    github: GitHubClient,
+    provider: str | None,
+    cache: DiskCache | None = None,
+) -> None:
     """Run the full L1+L2 analysis pipeline."""
-    from summary.agent import RepoAnalyzer
-    from summary.llm import create_llm_client
-
     llm = create_llm_client(provider=provider)
-    analyzer = RepoAnalyzer(github=github, llm=llm)
+    analyzer = RepoAnalyzer(github=github, llm=llm, cache=cache)
 
     try:
         owner, repo = GitHubClient.parse_url(url)
@@ -94,14 +104,16 @@ async def run_analysis(url: str, github: GitHubClient, provider: str | None) ->
         print("\n" + "═" * 60)
         print("📋 SUMMARY")
         print("═" * 60)
-        print(json.dumps(
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(
             {
                 "summary": result.summary,
                 "technologies": result.technologies,
                 "structure": result.structure,
             },
-            indent=2,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE,
         ))
+        sys.stdout.buffer.flush()
     finally:
         await llm.close()
 
@@ -133,6 +145,11 @@ def main() -> None:
         action="store_true",
         help="Run without GitHub authentication (60 req/hr limit)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the on-disk cache (GitHub content, summaries)",
+    )
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -156,16 +173,19 @@ def main() -> None:
     else:
         print("🔓 No token — unauthenticated API (60 req/hr)")
 
-    github = GitHubClient(token=token)
+    cache = None if args.no_cache else DiskCache()
+    github = GitHubClient(token=token, cache=cache)
 
     async def run():
         try:
             if args.readme_only:
                 await run_readme(args.url, github)
             else:
-                await run_analysis(args.url, github, args.provider)
+                await run_analysis(args.url, github, args.provider, cache)
         finally:
             await github.close()
+            if cache is not None:
+                cache.close()
 
     asyncio.run(run())
 
@@ -14,16 +14,22 @@ from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, field_validator
 
 from summary.agent import RepoAnalyzer
+from summary.cache import DiskCache, TTLCache
 from summary.github import (
     GitHubClient,
     GitHubError,
     RateLimitError,
     RepoNotFoundError,
 )
-from summary.llm import create_llm_client
+from summary.llm import SummaryResult, create_llm_client
 
 DEFAULT_TOKEN_FILE = Path("~/.ssh/github_token").expanduser()
 
+# Hot repos are answered from memory; the TTL bounds how stale a summary
+# can get after a push.
+SUMMARY_CACHE_SIZE = 256
+SUMMARY_CACHE_TTL_SECONDS = 600
+
 
 # ── Pydantic models ─────────────────────────────────────────────────────
 
@@ -69,15 +75,21 @@ def _load_github_token() -> str | None:
 async def lifespan(app: FastAPI):
     """Manage shared resources (HTTP clients) across the app lifecycle."""
     github_token = _load_github_token()
-    app.state.github = GitHubClient(token=github_token)
+    app.state.cache = DiskCache()
+    app.state.github = GitHubClient(token=github_token, cache=app.state.cache)
     app.state.llm = create_llm_client()
+    app.state.summaries = TTLCache[tuple[str, str], SummaryResult](
+        maxsize=SUMMARY_CACHE_SIZE, ttl=SUMMARY_CACHE_TTL_SECONDS,
+    )
     app.state.analyzer = RepoAnalyzer(
         github=app.state.github,
         llm=app.state.llm,
+        cache=app.state.cache,
     )
     yield
     await app.state.github.close()
     await app.state.llm.close()
+    app.state.cache.close()
 
 
 app = FastAPI(
@@ -103,18 +115,31 @@ app = FastAPI(
 async def summarize(request: SummarizeRequest) -> SummarizeResponse:
     """Analyze a GitHub repository and return a structured summary."""
     analyzer: RepoAnalyzer = app.state.analyzer
+    summaries: TTLCache[tuple[str, str], SummaryResult] = app.state.summaries
 
     try:
         # Validate URL early
-        GitHubClient.parse_url(request.github_url)
+        owner, repo = GitHubClient.parse_url(request.github_url)
     except ValueError as e:
         raise HTTPException(status_code=400, detail={
             "status": "error",
             "message": str(e),
         })
 
+    # GitHub owner/repo names are case-insensitive
+    cache_key = (owner.lower(), repo.lower())
+    result = summaries.get(cache_key)
+    if result is not None:
+        return SummarizeResponse(
+            summary=result.summary,
+            technologies=result.technologies,
+            structure=result.structure,
+        )
+
     try:
         result, stats = await analyzer.analyze(request.github_url)
+        if result.summary:
+            summaries.set(cache_key, result)
         return SummarizeResponse(
             summary=result.summary,
             technologies=result.technologies,
@@ -6,14 +6,29 @@ a structured summary of a GitHub repository.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
+from collections.abc import AsyncIterator, Iterator
 from dataclasses import dataclass, field
 
+import orjson
+
 log = logging.getLogger(__name__)
 
+from summary.cache import DiskCache
 from summary.github import GitHubClient, FileType, TreeEntry
-from summary.llm import LLMClient, SummaryResult, TokenUsage, count_tokens
+from summary.llm import (
+    FAST_TOKEN_ESTIMATE,
+    LLMClient,
+    SummaryResult,
+    TokenUsage,
+    count_tokens,
+    count_tokens_batch,
+    count_tokens_fast,
+    decode_tokens,
+    encode_tokens,
+)
 from summary.tree import (
     PruneConfig,
     find_l1_files,
@@ -23,6 +38,30 @@ from summary.tree import (
 
 DEFAULT_MAX_CONTEXT_TOKENS = 80_000
 DEFAULT_MAX_FILE_TOKENS = 10_000  # Truncate individual files beyond this
+DEFAULT_L2_SKIP_RATIO = 0.3  # Skip L2 once tree + L1 (with a README) use this much
+L2_MIN_REMAINING_TOKENS = 5_000  # Skip L2 when less budget than this is left
+# Upper bound on a section's tokens beyond its path and capped content:
+# header punctuation, separator and truncation marker
+_SECTION_OVERHEAD_TOKENS = 64
+
+SECTION_SEPARATOR = "\n\n---\n\n"
+
+# Fallback file picker: high-priority config filenames (case-insensitive)
+_CONFIG_NAMES = frozenset({
+    "makefile", "cmakelists.txt", "meson.build",
+    "pyproject.toml", "setup.py", "setup.cfg",
+    "package.json", "cargo.toml", "go.mod",
+    "gemfile", "build.gradle", "pom.xml",
+    "dockerfile", "docker-compose.yml",
+    ".github/workflows/ci.yml",
+})
+
+_DOC_EXTENSIONS = frozenset({"md", "rst", "txt"})
+
+_SOURCE_EXTENSIONS = frozenset({
+    "py", "go", "rs", "js", "ts", "c", "h",
+    "java", "rb", "sh", "toml", "yaml", "yml", "json",
+})
 
 
 @dataclass
@@ -43,6 +82,12 @@ class AnalysisStats:
     llm_total_tokens: int = 0
     elapsed_seconds: float = 0.0
 
+    def add_llm_usage(self, usage: TokenUsage) -> None:
+        """Add the LLM tokens used by one stage of the analysis."""
+        self.llm_input_tokens += usage.input_tokens
+        self.llm_output_tokens += usage.output_tokens
+        self.llm_total_tokens += usage.total_tokens
+
     @property
     def budget_used_pct(self) -> float:
         return (self.total_tokens / self.budget) * 100 if self.budget else 0
@@ -73,9 +118,29 @@ class AnalysisContext:
     tokens_used: int = 0
     _budget: int = DEFAULT_MAX_CONTEXT_TOKENS
 
-    def add_section(self, label: str, content: str, store: dict[str, str]) -> int:
-        """Add content to context, return tokens consumed."""
-        tokens = count_tokens(content)
+    def set_tree(self, tree_text: str) -> int:
+        """Set the directory tree section, return tokens consumed."""
+        self.tree_text = tree_text
+        tokens = count_tokens(self._tree_section())
+        self.tokens_used += tokens
+        return tokens
+
+    def add_section(
+        self,
+        label: str,
+        content: str,
+        store: dict[str, str],
+        tokens: int | None = None,
+    ) -> int:
+        """Add content to context, return tokens consumed.
+
+        Pass ``tokens`` if the caller already counted ``content``. The
+        section header and separator are counted too, so ``tokens_used``
+        tracks the size of format()'s output without re-tokenizing it.
+        """
+        if tokens is None:
+            tokens = count_tokens(content)
+        tokens += count_tokens(f"## {label}\n\n") + count_tokens(SECTION_SEPARATOR)
         store[label] = content
         self.tokens_used += tokens
         return tokens
@@ -87,26 +152,24 @@ class AnalysisContext:
     def set_budget(self, budget: int) -> None:
         self._budget = budget
 
-    def format(self) -> str:
-        """Build the final context string for the summarizer LLM."""
-        sections: list[str] = []
-
+    def sections(self) -> Iterator[str]:
+        """Yield the context sections in prompt order."""
         # Directory tree first (as user requested)
         if self.tree_text:
-            sections.append(
-                f"## Directory Structure\n\n```\n{self.tree_text}\n```"
-            )
+            yield self._tree_section()
 
-        # L1 files (README, AGENTS.md, etc.)
-        for path, content in self.l1_files.items():
-            sections.append(f"## {path}\n\n{content}")
+        # L1 files (README, AGENTS.md, etc.), then L2 files
+        # (LLM-selected config, docs, source)
+        for files in (self.l1_files, self.l2_files):
+            for path, content in files.items():
+                yield f"## {path}\n\n{content}"
 
-        # L2 files (LLM-selected config, docs, source)
-        if self.l2_files:
-            for path, content in self.l2_files.items():
-                sections.append(f"## {path}\n\n{content}")
+    def format(self) -> str:
+        """Build the final context string for the summarizer LLM."""
+        return SECTION_SEPARATOR.join(self.sections())
 
-        return "\n\n---\n\n".join(sections)
+    def _tree_section(self) -> str:
+        return f"## Directory Structure\n\n```\n{self.tree_text}\n```"
 
 
 class RepoAnalyzer:
@@ -115,24 +178,52 @@ class RepoAnalyzer:
     L1 (deterministic): Fetch README, AGENTS.md, llms.txt + generate tree.
     L2 (LLM-guided):    Ask LLM which files to read, then fetch them.
     Final:              Ask LLM to summarize everything.
+
+    If a DiskCache is given, summaries are cached by a hash of the exact
+    context sent to the LLM, so re-analyzing an unchanged repo skips the
+    summarization call.
+
+    L2 is skipped when the tree and L1 files (including a README) already
+    fill ``l2_skip_ratio`` of the context budget — the docs are then rich
+    enough on their own. Pass ``l2_skip_ratio=None`` to always run L2.
     """
 
     def __init__(
         self,
         github: GitHubClient,
         llm: LLMClient,
+        cache: DiskCache | None = None,
+        l2_skip_ratio: float | None = DEFAULT_L2_SKIP_RATIO,
     ) -> None:
         self._github = github
         self._llm = llm
+        self._cache = cache
+        self._l2_skip_ratio = l2_skip_ratio
         self._max_context_tokens = llm.MAX_CONTEXT_TOKENS
         self._max_file_tokens = llm.MAX_FILE_TOKENS
 
     async def analyze(self, url: str) -> tuple[SummaryResult, AnalysisStats]:
         """Run the full analysis pipeline for a GitHub repository URL.
 
+        Equivalent to gather_context() followed by summarize_context().
+
         Returns:
             Tuple of (SummaryResult, AnalysisStats).
         """
+        ctx, stats = await self.gather_context(url)
+        result = await self.summarize_context(ctx, stats)
+        return result, stats
+
+    async def gather_context(self, url: str) -> tuple[AnalysisContext, AnalysisStats]:
+        """Fetch the tree and L1/L2 files for a repository, without summarizing.
+
+        Split from summarize_context() so batch callers can build every
+        repository's context first and then submit the summaries together.
+
+        Returns:
+            Tuple of (AnalysisContext, AnalysisStats) to pass to
+            summarize_context().
+        """
         t0 = time.monotonic()
         owner, repo = GitHubClient.parse_url(url)
         ctx = AnalysisContext()
@@ -143,14 +234,16 @@ class RepoAnalyzer:
                  owner, repo, self._max_context_tokens, self._max_file_tokens)
 
         # ── Fetch and process the tree ──
+        # Pin every fetch to one commit so the tree and files agree and
+        # the GitHub client can serve repeat runs from its cache.
         t_tree = time.monotonic()
-        raw_tree = await self._github.fetch_tree(owner, repo)
+        ref = await self._github.get_head_sha(owner, repo)
+        raw_tree = await self._github.fetch_tree(owner, repo, ref=ref)
         log.info("  📂 Tree fetched: %d entries in %.1fs",
                  len(raw_tree), time.monotonic() - t_tree)
 
         pruned = prune_tree(raw_tree)
-        ctx.tree_text = format_tree(pruned)
-        ctx.tokens_used += count_tokens(ctx.tree_text)
+        ctx.set_tree(format_tree(pruned))
 
         stats.tree_entries_raw = len(raw_tree)
         stats.tree_entries_pruned = len(pruned)
@@ -159,28 +252,102 @@ class RepoAnalyzer:
         log.info("  📂 Tree pruned: %d → %d entries (%d tokens)",
                  len(raw_tree), len(pruned), ctx.tokens_used)
 
-        # ── L1: Fetch deterministic files ──
+        # ── L1 + L2: Fetch files ──
+        # When L1 can't possibly make L2 unnecessary, start the L2 file
+        # picker right away so its LLM round-trip overlaps the L1 fetches.
+        # The budget can't account for L1 files yet, so the picker may
+        # over-select; the L2 loop stops once the budget is spent. Otherwise
+        # the picker waits for L1, so a skipped L2 costs no LLM call.
         l1_entries = find_l1_files(raw_tree)
+        with self._llm.usage_scope() as usage:
+            pick_task = None
+            if not self._l2_may_be_skipped(ctx, l1_entries):
+                pick_task = asyncio.create_task(
+                    self._llm.pick_files(ctx.tree_text, ctx.tokens_remaining)
+                )
+            try:
+                await self._fetch_l1(owner, repo, ref, raw_tree, l1_entries, ctx, stats)
+                await self._fetch_l2(owner, repo, ref, raw_tree, ctx, stats, pick_task)
+            finally:
+                if pick_task is not None:
+                    _cancel_pending([pick_task])
+
+        stats.total_tokens = ctx.tokens_used
+        stats.add_llm_usage(usage)
+        stats.elapsed_seconds = time.monotonic() - t0
+        return ctx, stats
+
+    async def summarize_context(
+        self, ctx: AnalysisContext, stats: AnalysisStats,
+    ) -> SummaryResult:
+        """Summarize a context from gather_context(), updating its stats."""
+        t0 = time.monotonic()
+        with self._llm.usage_scope() as usage:
+            result = await self._summarize(ctx)
+
+        stats.add_llm_usage(usage)
+        stats.elapsed_seconds += time.monotonic() - t0
+        log.info("\n%s", stats.format())
+        return result
+
+    async def _fetch_l1(
+        self,
+        owner: str,
+        repo: str,
+        ref: str,
+        raw_tree: list[TreeEntry],
+        l1_entries: list[TreeEntry],
+        ctx: AnalysisContext,
+        stats: AnalysisStats,
+    ) -> None:
+        """L1: fetch the deterministic well-known files (README, AGENTS.md, ...)."""
         l1_token_start = ctx.tokens_used
-        for entry in l1_entries:
-            if ctx.tokens_remaining <= 0:
-                break
-            content = await self._github.fetch_file(owner, repo, entry.path)
-            content = self._truncate(content)
-            tokens = ctx.add_section(entry.path, content, ctx.l1_files)
-            log.debug("  📄 L1: %s (%d tokens)", entry.path, tokens)
+        l1_tasks = self._start_fetches(
+            owner, repo, ref, raw_tree, [e.path for e in l1_entries]
+        )
+        try:
+            results = self._truncated_results(l1_tasks)
+            for entry in l1_entries:
+                if ctx.tokens_remaining <= 0:
+                    break
+                result = await anext(results)
+                if isinstance(result, BaseException):
+                    raise result
+                content, tokens = result
+                ctx.add_section(entry.path, content, ctx.l1_files, tokens)
+                log.debug("  📄 L1: %s (%d tokens)", entry.path, tokens)
+        finally:
+            _cancel_pending(l1_tasks)
         stats.l1_files = len(ctx.l1_files)
         stats.l1_tokens = ctx.tokens_used - l1_token_start
 
         log.debug("  📊 After L1: %d tokens used, %d remaining",
                   ctx.tokens_used, ctx.tokens_remaining)
 
-        # ── L2: LLM-guided file selection ──
+    async def _fetch_l2(
+        self,
+        owner: str,
+        repo: str,
+        ref: str,
+        raw_tree: list[TreeEntry],
+        ctx: AnalysisContext,
+        stats: AnalysisStats,
+        pick_task: asyncio.Task[list[str]] | None,
+    ) -> None:
+        """L2: fetch the files chosen by the LLM file picker.
+
+        ``pick_task`` is the picker started before L1, or None to ask it
+        now (with a budget that accounts for L1).
+        """
         l2_token_start = ctx.tokens_used
-        if ctx.tokens_remaining > 5_000:
-            l2_paths = await self._llm.pick_files(
-                ctx.tree_text, ctx.tokens_remaining
-            )
+        if self._l1_is_sufficient(ctx):
+            log.info("  ⏭️  Tree + L1 already cover %d tokens, skipping L2",
+                     ctx.tokens_used)
+        elif ctx.tokens_remaining > L2_MIN_REMAINING_TOKENS:
+            if pick_task is None:
+                l2_paths = await self._llm.pick_files(ctx.tree_text, ctx.tokens_remaining)
+            else:
+                l2_paths = await pick_task
             log.info("  🤖 LLM picked %d files: %s", len(l2_paths), l2_paths)
 
             # Filter out L1 files (already fetched).
@@ -196,62 +363,186 @@ class RepoAnalyzer:
 
             stats.l2_files_requested = len(l2_paths)
 
-            for path in l2_paths:
-                if ctx.tokens_remaining <= 0:
-                    log.warning("  ⚠️  Budget exhausted, skipping remaining L2 files")
-                    break
-                try:
-                    content = await self._github.fetch_file(owner, repo, path)
-                    content = self._truncate(content)
-                    tokens = ctx.add_section(path, content, ctx.l2_files)
+            l2_tasks = self._start_fetches(owner, repo, ref, raw_tree, l2_paths)
+            try:
+                results = self._truncated_results(l2_tasks)
+                for path in l2_paths:
+                    if ctx.tokens_remaining <= 0:
+                        log.warning("  ⚠️  Budget exhausted, skipping remaining L2 files")
+                        break
+                    result = await anext(results)
+                    if isinstance(result, Exception):
+                        log.warning("  ⚠️  Failed to fetch %s: %s", path, result)
+                        continue
+                    if isinstance(result, BaseException):
+                        raise result
+                    content, tokens = result
+                    ctx.add_section(path, content, ctx.l2_files, tokens)
                     log.debug("  📄 L2: %s (%d tokens)", path, tokens)
-                except Exception as e:
-                    log.warning("  ⚠️  Failed to fetch %s: %s", path, e)
+            finally:
+                _cancel_pending(l2_tasks)
 
         stats.l2_files_fetched = len(ctx.l2_files)
         stats.l2_tokens = ctx.tokens_used - l2_token_start
-        stats.total_tokens = ctx.tokens_used
 
-        # ── Summarize ──
-        context_str = ctx.format()
-        log.info("  🧠 Sending %d tokens to LLM for summarization...",
-                 count_tokens(context_str))
-        result = await self._llm.summarize(context_str)
+    def _l2_may_be_skipped(
+        self, ctx: AnalysisContext, l1_entries: list[TreeEntry],
+    ) -> bool:
+        """Whether L1 could leave nothing for L2 to do, judged from tree sizes.
 
-        # Capture LLM usage stats
-        llm_usage = self._llm.total_usage
-        stats.llm_input_tokens = llm_usage.input_tokens
-        stats.llm_output_tokens = llm_usage.output_tokens
-        stats.llm_total_tokens = llm_usage.total_tokens
+        Every token covers at least one byte, so each file's size (capped
+        at the per-file limit) bounds its tokens. When even that upper
+        bound can't make _l1_is_sufficient() true or use up the budget, L2
+        is certain to run.
+        """
+        bound = ctx.tokens_used + sum(
+            min(e.size, self._max_file_tokens) + len(e.path) + _SECTION_OVERHEAD_TOKENS
+            for e in l1_entries
+        )
+        if self._max_context_tokens - bound <= L2_MIN_REMAINING_TOKENS:
+            return True
+        if self._l2_skip_ratio is None:
+            return False
+        has_readme = any(e.path.lower().startswith("readme") for e in l1_entries)
+        return has_readme and bound >= self._max_context_tokens * self._l2_skip_ratio
+
+    def _l1_is_sufficient(self, ctx: AnalysisContext) -> bool:
+        """Whether tree + L1 context is rich enough to summarize without L2."""
+        if self._l2_skip_ratio is None:
+            return False
+        has_readme = any(p.lower().startswith("readme") for p in ctx.l1_files)
+        return (has_readme
+                and ctx.tokens_used >= self._max_context_tokens * self._l2_skip_ratio)
+
+    async def _summarize(self, ctx: AnalysisContext) -> SummaryResult:
+        """Summarize the context, reusing a cached result for identical input."""
+        context = ctx.format()
+        cache_key = None
+        if self._cache is not None:
+            cache_key = f"summary:{self._llm.summary_cache_key(context)}"
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                log.info("  🧠 Summary served from cache")
+                return SummaryResult(**orjson.loads(cached))
+
+        log.info("  🧠 Sending ~%d tokens to LLM for summarization...",
+                 ctx.tokens_used)
+        result = await self._llm.summarize(context)
+
+        if cache_key is not None:
+            self._cache.set(cache_key, orjson.dumps(result).decode())
+        return result
+
+    def _start_fetches(
+        self,
+        owner: str,
+        repo: str,
+        ref: str,
+        raw_tree: list[TreeEntry],
+        paths: list[str],
+    ) -> list[asyncio.Task[str]]:
+        """Start fetching all paths concurrently (GitHubClient caps in-flight requests).
+
+        Paths present in the tree are fetched by blob SHA; others (e.g. L2
+        picks beyond the depth-limited tree) fall back to the Contents API.
+        Tasks are returned in the same order as ``paths`` so callers can
+        consume results deterministically while later fetches are in flight.
+        """
+        blob_shas = {
+            e.path: e.sha for e in raw_tree
+            if e.type == FileType.BLOB and e.sha
+        }
 
-        stats.elapsed_seconds = time.monotonic() - t0
-        log.info("\n%s", stats.format())
+        async def fetch(path: str) -> str:
+            sha = blob_shas.get(path)
+            if sha:
+                return await self._github.fetch_blob(owner, repo, sha)
+            return await self._github.fetch_file(owner, repo, path, ref=ref)
 
-        return result, stats
+        return [asyncio.create_task(fetch(p)) for p in paths]
 
-    def _truncate(self, content: str) -> str:
-        """Truncate file content if it exceeds the per-file token limit."""
-        tokens = count_tokens(content)
-        if tokens <= self._max_file_tokens:
-            return content
-
-        # Take first N lines until we're under budget
-        lines = content.split("\n")
-        truncated_lines: list[str] = []
-        running_tokens = 0
-
-        for line in lines:
-            line_tokens = count_tokens(line)
-            if running_tokens + line_tokens > self._max_file_tokens:
-                break
-            truncated_lines.append(line)
-            running_tokens += line_tokens
-
-        truncated_lines.append(
-            f"\n[... truncated — {tokens:,} tokens total, "
-            f"showing first {running_tokens:,} ...]"
+    async def _truncated_results(
+        self, tasks: list[asyncio.Task[str]],
+    ) -> AsyncIterator[tuple[str, int] | BaseException]:
+        """Yield each fetch's truncated (content, tokens), or its error, in order.
+
+        Fetches that have already finished by the time the next one is
+        awaited are counted together with count_tokens_batch, so the
+        tokenizer runs once per burst of completions rather than per file.
+        """
+        i = 0
+        while i < len(tasks):
+            await asyncio.wait([tasks[i]])
+            j = i + 1
+            while j < len(tasks) and tasks[j].done():
+                j += 1
+
+            ready = tasks[i:j]
+            contents = [t.result() for t in ready if t.exception() is None]
+            if len(contents) > 1:
+                counts = count_tokens_batch(contents)
+            else:
+                counts = [None] * len(contents)
+            truncated = (self._truncate(c, n) for c, n in zip(contents, counts))
+
+            for task in ready:
+                yield task.exception() or next(truncated)
+            i = j
+
+    def _truncate(self, content: str, tokens: int | None = None) -> tuple[str, int]:
+        """Truncate file content if it exceeds the per-file token limit.
+
+        Args:
+            content: The file content.
+            tokens: Its token count, if already known (e.g. from a batch).
+
+        Returns:
+            Tuple of (content, token count of the returned content).
+        """
+        if tokens is not None and tokens <= self._max_file_tokens:
+            return content, tokens
+
+        # Fast path: every token covers at least one UTF-8 byte, so content
+        # no longer (in bytes) than the limit can't exceed it. Most files
+        # take this path, and count_tokens is memoized across runs.
+        if len(content) <= self._max_file_tokens and (
+            content.isascii()
+            or len(content.encode("utf-8")) <= self._max_file_tokens
+        ):
+            return content, count_tokens(content)
+
+        if FAST_TOKEN_ESTIMATE:
+            # Slice by the same ~4 chars/token estimate, so fast mode never
+            # loads the tokenizer
+            total = count_tokens(content)
+            if total <= self._max_file_tokens:
+                return content, total
+            kept = content[:self._max_file_tokens * 4]
+            cut = kept.rfind("\n")
+            if cut != -1:
+                kept = kept[:cut]
+            kept_tokens = count_tokens_fast(kept)
+        else:
+            tokens = encode_tokens(content)
+            total = len(tokens)
+            if total <= self._max_file_tokens:
+                return content, total
+
+            # Keep the first N tokens and cut back to the last line boundary.
+            # Only the dropped partial line is re-counted, so the kept prefix
+            # and its token count come from the single encode above.
+            kept = decode_tokens(tokens[:self._max_file_tokens])
+            kept_tokens = self._max_file_tokens
+            cut = kept.rfind("\n")
+            if cut != -1:
+                kept_tokens -= count_tokens(kept[cut:])
+                kept = kept[:cut]
+
+        marker = (
+            f"\n\n[... truncated — {total:,} tokens total, "
+            f"showing first {kept_tokens:,} ...]"
         )
-        return "\n".join(truncated_lines)
+        return kept + marker, kept_tokens + count_tokens(marker)
 
     @staticmethod
     def _fallback_file_picker(
@@ -265,48 +556,37 @@ class RepoAnalyzer:
         2. Documentation files (depth ≤ 1)
         3. Small top-level source files
         """
-        # High-priority config filenames (case-insensitive)
-        CONFIG_NAMES = {
-            "makefile", "cmakelists.txt", "meson.build",
-            "pyproject.toml", "setup.py", "setup.cfg",
-            "package.json", "cargo.toml", "go.mod",
-            "gemfile", "build.gradle", "pom.xml",
-            "dockerfile", "docker-compose.yml",
-            ".github/workflows/ci.yml",
-        }
+        # Classify each entry in one pass; an entry lands in the first
+        # bucket it qualifies for, so no dedup across buckets is needed.
+        configs: list[str] = []   # 1. Config files at root
+        docs: list[str] = []      # 2. Docs at depth ≤ 1
+        sources: list[str] = []   # 3. Small source files at root (< 20KB)
+
+        for entry in tree:
+            if entry.type != FileType.BLOB or entry.path in already_fetched:
+                continue
+            depth = entry.depth
+            if depth > 1:
+                continue
+            if entry.name_lower in _CONFIG_NAMES:
+                configs.append(entry.path)
+                continue
+            extension = entry.extension
+            if extension in _DOC_EXTENSIONS:
+                if entry.size < 50_000:
+                    docs.append(entry.path)
+            elif (extension in _SOURCE_EXTENSIONS
+                    and depth == 0
+                    and entry.size < 20_000):
+                sources.append(entry.path)
 
-        DOC_EXTENSIONS = {"md", "rst", "txt"}
-        SOURCE_EXTENSIONS = {
-            "py", "go", "rs", "js", "ts", "c", "h",
-            "java", "rb", "sh", "toml", "yaml", "yml", "json",
-        }
+        return (configs + docs + sources)[:30]  # Cap at 30 files
 
-        blobs = [
-            e for e in tree
-            if e.type == FileType.BLOB and e.path not in already_fetched
-        ]
-
-        picked: list[str] = []
-
-        # 1. Config files at root
-        for entry in blobs:
-            if entry.name.lower() in CONFIG_NAMES and entry.depth <= 1:
-                picked.append(entry.path)
-
-        # 2. Docs at depth ≤ 1
-        for entry in blobs:
-            if (entry.extension in DOC_EXTENSIONS
-                    and entry.depth <= 1
-                    and entry.path not in picked
-                    and entry.size < 50_000):
-                picked.append(entry.path)
-
-        # 3. Small source files at root (< 20KB)
-        for entry in blobs:
-            if (entry.extension in SOURCE_EXTENSIONS
-                    and entry.depth == 0
-                    and entry.path not in picked
-                    and entry.size < 20_000):
-                picked.append(entry.path)
 
-        return picked[:30]  # Cap at 30 files
+def _cancel_pending(tasks: list[asyncio.Task]) -> None:
+    """Cancel unfinished tasks and mark finished ones' exceptions as retrieved."""
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()
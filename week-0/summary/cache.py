@@ -0,0 +1,129 @@
+"""Caches for GitHub content and analysis results.
+
+DiskCache is a small SQLite key/value store with per-entry expiry. Callers
+namespace their keys (e.g. ``tree:owner/repo@sha``) and mostly cache data
+addressed by an immutable SHA, so those entries never go stale before they
+expire; anything mutable (like a repo's default branch) gets a short TTL.
+
+TTLCache is an in-process LRU for hot results whose freshness can't be
+pinned to a SHA, so entries expire quickly instead.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from pathlib import Path
+from typing import Generic, TypeVar
+
+DEFAULT_CACHE_DIR = Path("~/.cache/repo-summarizer").expanduser()
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600  # 7 days
+PURGE_EVERY_WRITES = 1000  # Long-lived processes also purge expired rows this often
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DiskCache:
+    """SQLite-backed string cache with a time-to-live per entry."""
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        ttl: float = DEFAULT_TTL_SECONDS,
+    ) -> None:
+        if path is None:
+            path = DEFAULT_CACHE_DIR / "cache.sqlite3"
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._ttl = ttl
+        self._db = sqlite3.connect(path, timeout=10.0)
+        # Calls run on the event loop thread, so commits must stay cheap:
+        # WAL with synchronous=NORMAL doesn't fsync on every commit.
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "  key TEXT PRIMARY KEY,"
+            "  content TEXT NOT NULL,"
+            "  created_at REAL NOT NULL,"
+            "  expires_at REAL NOT NULL"
+            ")"
+        )
+        self._writes = 0
+        self._purge_expired()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached value for ``key``, or None if missing/expired."""
+        row = self._db.execute(
+            "SELECT content, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        content, expires_at = row
+        if expires_at < time.time():
+            self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+        return content
+
+    def set(self, key: str, content: str, ttl: float | None = None) -> None:
+        """Store ``content`` under ``key``, replacing any existing entry."""
+        now = time.time()
+        expires_at = now + (self._ttl if ttl is None else ttl)
+        self._db.execute(
+            "INSERT OR REPLACE INTO cache (key, content, created_at, expires_at) "
+            "VALUES (?, ?, ?, ?)",
+            (key, content, now, expires_at),
+        )
+        self._db.commit()
+
+        self._writes += 1
+        if self._writes % PURGE_EVERY_WRITES == 0:
+            self._purge_expired()
+
+    def _purge_expired(self) -> None:
+        """Delete every expired row.
+
+        get() only drops an expired row when its key is read again, which
+        SHA-keyed entries (e.g. superseded subtrees) rarely are, so without
+        this the file would grow without bound.
+        """
+        self._db.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+        self._db.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._db.close()
+
+
+class TTLCache(Generic[K, V]):
+    """In-memory LRU cache whose entries expire ``ttl`` seconds after insertion."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 600.0) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        """Return the cached value for ``key``, or None if missing/expired."""
+        item = self._data.get(key)
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store ``value`` under ``key``, evicting the least recently used entry."""
+        self._data[key] = (time.monotonic() + self._ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
@@ -2,10 +2,15 @@
 
 from __future__ import annotations
 
+import logging
 import os
 
+from pydantic import BaseModel
+
 from summary.llm import LLMClient, TokenUsage
 
+log = logging.getLogger(__name__)
+
 
 class GoogleLLMClient(LLMClient):
     """LLM client for Google GenAI (Gemini models)."""
@@ -18,29 +23,61 @@ class GoogleLLMClient(LLMClient):
         model: str | None = None,
     ) -> None:
         super().__init__()
+        # Imported here so the package stays optional for Nebius-only use
         from google import genai
+        from google.genai import types
 
+        self._types = types
         self._model = model or self.DEFAULT_MODEL
         self._client = genai.Client(
             api_key=api_key or os.environ.get("GOOGLE_API_KEY", ""),
         )
 
-    async def complete(self, system: str, user: str) -> tuple[str, TokenUsage]:
-        from google.genai import types
+    async def warmup(self) -> None:
+        await super().warmup()
+        try:
+            await self._client.aio.models.get(model=self._model)
+        except Exception as e:  # google-genai has no common base error
+            log.debug("Gemini warmup request failed: %s", e)
 
-        response = await self._client.aio.models.generate_content(
+    async def complete(
+        self,
+        system: str,
+        user: str,
+        schema: type[BaseModel] | None = None,
+    ) -> tuple[str, TokenUsage]:
+        types = self._types
+
+        # With a schema, Gemini guarantees JSON matching it, so the
+        # caller's fence-stripping and repair fallbacks never trigger.
+        config = types.GenerateContentConfig(
+            system_instruction=system,
+            temperature=0.2,
+            response_mime_type="application/json" if schema else None,
+            response_schema=schema,
+        )
+
+        # Stream the response so generation overlaps with network transfer
+        # instead of waiting for one large payload at the end.
+        stream = await self._client.aio.models.generate_content_stream(
             model=self._model,
             contents=user,
-            config=types.GenerateContentConfig(
-                system_instruction=system,
-                temperature=0.2,
-            ),
+            config=config,
         )
+        chunks: list[str] = []
+        usage_metadata = None
+        async for chunk in stream:
+            if chunk.text:
+                chunks.append(chunk.text)
+            # Usage is cumulative; the final chunk carries the totals
+            if chunk.usage_metadata:
+                usage_metadata = chunk.usage_metadata
+
         usage = TokenUsage()
-        if response.usage_metadata:
+        if usage_metadata:
             usage = TokenUsage(
-                input_tokens=response.usage_metadata.prompt_token_count or 0,
-                output_tokens=response.usage_metadata.candidates_token_count or 0,
-                total_tokens=response.usage_metadata.total_token_count or 0,
+                input_tokens=usage_metadata.prompt_token_count or 0,
+                output_tokens=usage_metadata.candidates_token_count or 0,
+                total_tokens=usage_metadata.total_token_count or 0,
             )
-        return response.text or "", usage
+        return "".join(chunks), usage
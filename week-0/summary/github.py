@@ -2,12 +2,24 @@
 
 from __future__ import annotations
 
-import base64
+import asyncio
+import itertools
+import logging
+import random
 import re
-from dataclasses import dataclass
+import time
+import urllib.request
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from enum import Enum
+from urllib.parse import urlsplit
 
 import httpx
+import orjson
+
+from summary.cache import DiskCache, TTLCache
+
+log = logging.getLogger(__name__)
 
 
 class GitHubError(Exception):
@@ -28,63 +40,205 @@ class FileType(Enum):
     TREE = "tree"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TreeEntry:
-    """A single entry (file or directory) in the repository tree."""
+    """A single entry (file or directory) in the repository tree.
+
+    The path-derived fields are computed once at construction because the
+    filters and pickers read them for every entry, often several times.
+    """
     path: str
     type: FileType
     size: int  # 0 for directories
-
-    @property
-    def name(self) -> str:
-        """Filename without the directory path."""
-        return self.path.rsplit("/", 1)[-1]
-
-    @property
-    def extension(self) -> str:
-        """File extension (lowercase), empty string if none."""
-        if "." in self.name:
-            return self.name.rsplit(".", 1)[-1].lower()
-        return ""
-
-    @property
-    def depth(self) -> int:
-        """Directory nesting depth (0 for root-level files)."""
-        return self.path.count("/")
-
+    sha: str = ""  # Git object SHA (blob or tree)
+    name: str = field(init=False, repr=False, compare=False)       # Basename
+    name_lower: str = field(init=False, repr=False, compare=False)
+    extension: str = field(init=False, repr=False, compare=False)  # Lowercase, or ""
+    depth: int = field(init=False, repr=False, compare=False)      # 0 at the root
+    parent: str = field(init=False, repr=False, compare=False)     # "" at the root
+
+    def __post_init__(self) -> None:
+        parent, _, name = self.path.rpartition("/")
+        name_lower = name.lower()
+        _, dot, extension = name_lower.rpartition(".")
+        object.__setattr__(self, "parent", parent)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "name_lower", name_lower)
+        object.__setattr__(self, "extension", extension if dot else "")
+        object.__setattr__(self, "depth", self.path.count("/"))
+
+
+_TYPE_MAP: dict[str, FileType] = {t.value: t for t in FileType}
 
 _GITHUB_URL_PATTERN = re.compile(
     r"^https?://github\.com/(?P<owner>[^/]+)/(?P<repo>[^/]+?)(?:\.git)?/?$"
 )
 
+_COMMIT_SHA_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+
 API_BASE = "https://api.github.com"
 
+# Contents and Blobs API bodies as raw bytes instead of base64 inside JSON
+_RAW_HEADERS = {"Accept": "application/vnd.github.raw+json"}
+
+MAX_CONCURRENT_REQUESTS = 10  # In-flight API requests per token
+MAX_RETRIES = 5               # Retries on rate-limit responses (403/429)
+MAX_RETRY_DELAY = 60.0        # Give up rather than sleep longer than this
+RATE_LIMIT_LOW_WATER = 5      # Pause until reset below this many calls left
+
+# In-process caches. Content-addressed data (tree/blob SHAs) never goes
+# stale, so those TTLs only bound memory; branch-relative file reads use
+# a short TTL.
+MEMORY_CACHE_TTL = 300.0
+MEMORY_CACHE_SIZE = 512
+TREE_ITEMS_CACHE_TTL = 3600.0
+TREE_ITEMS_CACHE_SIZE = 4096
+DEFAULT_BRANCH_TTL = 3600.0
+
+_TREE_ITEM_KEYS = ("path", "type", "size", "sha")
+
+
+def _environment_proxy() -> str | None:
+    """Proxy URL for API_BASE from HTTPS_PROXY/ALL_PROXY, honoring NO_PROXY.
+
+    httpx only reads these itself when it builds the transport, so a
+    client given an explicit transport has to be told.
+    """
+    proxies = urllib.request.getproxies()
+    proxy = proxies.get("https") or proxies.get("all")
+    if proxy and urllib.request.proxy_bypass(urlsplit(API_BASE).hostname or ""):
+        return None
+    return proxy
+
+
+def _make_http(token: str | None) -> httpx.AsyncClient:
+    """Create the pooled HTTP client for one (optional) token."""
+    headers = {
+        "Accept": "application/vnd.github.v3+json",
+        "User-Agent": "repo-summarizer",
+    }
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    # One pooled client for the object's lifetime: keep-alive reuses
+    # TLS sessions, and HTTP/2 multiplexes concurrent fetches onto a
+    # single connection. Pool settings must live on the transport —
+    # httpx ignores the client's http2/limits when one is passed.
+    return httpx.AsyncClient(
+        base_url=API_BASE,
+        headers=headers,
+        timeout=30.0,
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=20,
+                keepalive_expiry=30.0,
+            ),
+            retries=2,  # Connection failures only; httpx drops this when proxied
+            proxy=_environment_proxy(),
+        ),
+    )
+
+
+@dataclass
+class _Session:
+    """An HTTP client for one token, plus the rate limit it last reported."""
+    http: httpx.AsyncClient
+    rl_remaining: int | None = None
+    rl_reset: float = 0.0
+    # Bounds this token's in-flight requests
+    semaphore: asyncio.Semaphore = field(
+        default_factory=lambda: asyncio.Semaphore(MAX_CONCURRENT_REQUESTS),
+    )
+
+    @property
+    def quota_low(self) -> bool:
+        """Whether fewer than RATE_LIMIT_LOW_WATER calls are left before reset."""
+        return (self.rl_remaining is not None
+                and self.rl_remaining < RATE_LIMIT_LOW_WATER
+                and self.rl_reset > time.time())
+
+    def track_rate_limit(self, response: httpx.Response) -> None:
+        """Record the primary rate limit state reported by a response."""
+        headers = response.headers
+        try:
+            self.rl_remaining = int(headers["X-RateLimit-Remaining"])
+            self.rl_reset = float(headers["X-RateLimit-Reset"])
+        except (KeyError, ValueError):
+            pass
+
+    async def wait_for_quota(self) -> None:
+        """Sleep until the rate limit resets if the quota is nearly spent.
+
+        Waits longer than MAX_RETRY_DELAY aren't worth blocking on; the
+        request goes ahead and surfaces RateLimitError if it's refused.
+        """
+        if not self.quota_low:
+            return
+        delay = self.rl_reset - time.time()
+        if delay <= MAX_RETRY_DELAY:
+            log.warning("  ⏳ GitHub quota low (%d left), pausing %.1fs",
+                        self.rl_remaining, delay)
+            await asyncio.sleep(delay)
+
 
 class GitHubClient:
     """Async client for the GitHub REST API.
 
     Fetches repository metadata, file trees, and individual file contents.
     Works without authentication (60 req/hr) or with an optional token
-    (5,000 req/hr).
+    (5,000 req/hr). Given several tokens, requests rotate between them,
+    each with its own quota, multiplying the hourly limit.
+
+    Responses are cached in memory: subtree listings by tree SHA, file
+    contents for a few minutes, and metadata lookups are revalidated with
+    ETags (a 304 doesn't count against the rate limit). If a DiskCache is
+    given, trees and file contents fetched at a pinned commit SHA (see
+    get_head_sha) are also served from disk across processes.
     """
 
-    def __init__(self, token: str | None = None) -> None:
-        headers = {
-            "Accept": "application/vnd.github.v3+json",
-            "User-Agent": "repo-summarizer",
-        }
-        if token:
-            headers["Authorization"] = f"Bearer {token}"
-
-        self._http = httpx.AsyncClient(
-            base_url=API_BASE,
-            headers=headers,
-            timeout=30.0,
+    def __init__(
+        self,
+        token: str | None = None,
+        cache: DiskCache | None = None,
+        tokens: Sequence[str] | None = None,
+    ) -> None:
+        # Several tokens (e.g. GITHUB_TOKENS) each get their own session and
+        # quota; requests rotate between them round-robin.
+        token_list: list[str | None] = list(tokens) if tokens else [token]
+        self._sessions = [_Session(_make_http(t)) for t in token_list]
+        self._rotation = itertools.cycle(self._sessions)
+        self._cache = cache
+
+        self._memory = TTLCache[str, str](MEMORY_CACHE_SIZE, MEMORY_CACHE_TTL)
+        self._trees = TTLCache[str, list[TreeEntry]](MEMORY_CACHE_SIZE, MEMORY_CACHE_TTL)
+        self._tree_items = TTLCache[str, list[dict]](
+            TREE_ITEMS_CACHE_SIZE, TREE_ITEMS_CACHE_TTL,
+        )
+        self._etags = TTLCache[str, tuple[str, str]](
+            MEMORY_CACHE_SIZE, TREE_ITEMS_CACHE_TTL,
         )
 
+    async def warmup(self) -> None:
+        """Open each token's connection and record its rate limit. Never raises.
+
+        GET /rate_limit doesn't count against the quota.
+        """
+        async def ping(session: _Session) -> None:
+            try:
+                response = await session.http.get("/rate_limit")
+            except httpx.HTTPError as e:
+                log.debug("GitHub warmup request failed: %s", e)
+                return
+            session.track_rate_limit(response)
+
+        await asyncio.gather(*(ping(session) for session in self._sessions))
+
     async def close(self) -> None:
-        """Close the underlying HTTP client."""
-        await self._http.aclose()
+        """Close the underlying HTTP clients."""
+        for session in self._sessions:
+            await session.http.aclose()
 
     @staticmethod
     def parse_url(url: str) -> tuple[str, str]:
@@ -115,13 +269,33 @@ class GitHubClient:
             RateLimitError: If the API rate limit is exceeded.
             GitHubError: For other API errors.
         """
-        response = await self._http.get(f"/repos/{owner}/{repo}")
-        self._check_response(response)
-        return response.json()["default_branch"]
+        # Default branches are rarely renamed, so an hour-old answer is fine
+        cache_key = f"branch:{owner}/{repo}"
+        branch = self._cache_get(cache_key)
+        if branch is None:
+            body = await self._get_revalidated(f"/repos/{owner}/{repo}")
+            branch = orjson.loads(body)["default_branch"]
+            self._cache_set(cache_key, branch, ttl=DEFAULT_BRANCH_TTL)
+        return branch
+
+    async def get_head_sha(self, owner: str, repo: str) -> str:
+        """Get the commit SHA at the head of the default branch.
+
+        Pinning later fetches to this SHA keeps the tree and file contents
+        consistent and makes them safe to cache.
+
+        Raises:
+            RepoNotFoundError, RateLimitError, GitHubError
+        """
+        body = await self._get_revalidated(
+            f"/repos/{owner}/{repo}/commits/HEAD",
+            headers={"Accept": "application/vnd.github.sha"},
+        )
+        return body.strip()
 
     async def fetch_tree(
         self, owner: str, repo: str, max_depth: int = 3,
-        max_api_calls: int = 50,
+        max_api_calls: int = 50, ref: str | None = None,
     ) -> list[TreeEntry]:
         """Fetch the file tree for a repository, limited to a given depth.
 
@@ -134,6 +308,7 @@ class GitHubClient:
             repo: Repository name.
             max_depth: Maximum directory depth to expand (0 = root only).
             max_api_calls: Maximum number of tree API calls to make.
+            ref: Commit SHA or branch to read; defaults to the default branch.
 
         Returns:
             List of TreeEntry objects (already filtered).
@@ -141,81 +316,72 @@ class GitHubClient:
         Raises:
             RepoNotFoundError, RateLimitError, GitHubError
         """
-        from summary.tree import should_skip
-        import logging
-        log = logging.getLogger(__name__)
-
-        branch = await self.get_default_branch(owner, repo)
-        api_calls = 0
+        cache_key = None
+        if ref and _COMMIT_SHA_PATTERN.match(ref):
+            cache_key = f"tree:{owner}/{repo}@{ref}:{max_depth}:{max_api_calls}"
+            entries = self._trees.get(cache_key)
+            if entries is None and self._cache is not None:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    entries = [
+                        TreeEntry(path=path, type=_TYPE_MAP[type_], size=size, sha=sha)
+                        for path, type_, size, sha in orjson.loads(cached)
+                    ]
+                    self._trees.set(cache_key, entries)
+            if entries is not None:
+                log.debug("  📂 Tree served from cache: %d entries", len(entries))
+                return list(entries)
+
+        if ref is None:
+            ref = await self.get_default_branch(owner, repo)
 
         # Fetch root tree (non-recursive)
-        response = await self._http.get(
-            f"/repos/{owner}/{repo}/git/trees/{branch}",
+        response = await self._get(
+            f"/repos/{owner}/{repo}/git/trees/{ref}",
         )
-        self._check_response(response)
-        data = response.json()
-        api_calls += 1
-
-        all_entries: list[TreeEntry] = []
-        dirs_to_expand: list[tuple[str, str, int]] = []
-
-        for item in data.get("tree", []):
-            try:
-                entry = TreeEntry(
-                    path=item["path"],
-                    type=FileType(item["type"]),
-                    size=item.get("size", 0),
-                )
-                if should_skip(entry):
-                    continue
-                all_entries.append(entry)
-                if entry.type == FileType.TREE and 0 < max_depth:
-                    dirs_to_expand.append((item["sha"], entry.path, 1))
-            except (ValueError, KeyError):
-                continue
+        api_calls = 1
+        all_entries, dirs_to_expand = _parse_tree(
+            orjson.loads(response.content).get("tree", []), "", 0, max_depth,
+        )
+        # A subtree that failed to fetch is missing from this result, so it
+        # mustn't be cached as the commit's tree
+        complete = True
 
         log.debug("  📂 Tree depth 0: %d entries, %d dirs to expand",
                   len(all_entries), len(dirs_to_expand))
 
-        # Expand subdirectories level by level
+        # Expand subdirectories level by level. Each level's directories
+        # are fetched concurrently (the client semaphore bounds in-flight
+        # requests); the API call cap is applied by slicing the level.
+        # Directories with identical contents share a tree SHA, so each
+        # distinct SHA is fetched once per level.
+        depth = 0
         while dirs_to_expand:
-            next_level: list[tuple[str, str, int]] = []
+            depth += 1
+            batch = dirs_to_expand[:max_api_calls - api_calls]
+            if len(batch) < len(dirs_to_expand):
+                log.debug("  📂 API call cap reached (%d), stopping expansion",
+                          max_api_calls)
+            api_calls += len(batch)
+
+            shas = list(dict.fromkeys(sha for sha, _, _ in batch))
+            results = await asyncio.gather(
+                *(self._fetch_tree_items(owner, repo, sha) for sha in shas),
+                return_exceptions=True,
+            )
+            items_by_sha = dict(zip(shas, results))
 
-            for sha, parent_path, depth in dirs_to_expand:
-                if api_calls >= max_api_calls:
-                    log.debug("  📂 API call cap reached (%d), stopping expansion",
-                              max_api_calls)
-                    break
-
-                try:
-                    response = await self._http.get(
-                        f"/repos/{owner}/{repo}/git/trees/{sha}",
-                    )
-                    self._check_response(response)
-                    api_calls += 1
-                    sub_data = response.json()
-
-                    for item in sub_data.get("tree", []):
-                        try:
-                            full_path = f"{parent_path}/{item['path']}"
-                            entry = TreeEntry(
-                                path=full_path,
-                                type=FileType(item["type"]),
-                                size=item.get("size", 0),
-                            )
-                            if should_skip(entry):
-                                continue
-                            all_entries.append(entry)
-                            if (entry.type == FileType.TREE
-                                    and depth < max_depth):
-                                next_level.append(
-                                    (item["sha"], full_path, depth + 1)
-                                )
-                        except (ValueError, KeyError):
-                            continue
-                except Exception as e:
+            next_level: list[tuple[str, str, int]] = []
+            for sha, parent_path, level in batch:
+                items = items_by_sha[sha]
+                if isinstance(items, BaseException):
                     log.warning("  ⚠️  Failed to fetch tree %s: %s",
-                                parent_path, e)
+                                parent_path, items)
+                    complete = False
+                    continue
+                entries, subdirs = _parse_tree(items, parent_path, level, max_depth)
+                all_entries.extend(entries)
+                next_level.extend(subdirs)
 
             if api_calls >= max_api_calls:
                 break
@@ -225,17 +391,52 @@ class GitHubClient:
             dirs_to_expand = next_level
 
         log.debug("  📂 Tree complete: %d entries, %d API calls", len(all_entries), api_calls)
+        if cache_key is not None and complete:
+            self._trees.set(cache_key, list(all_entries))
+            if self._cache is not None:
+                self._cache.set(cache_key, orjson.dumps(
+                    [[e.path, e.type.value, e.size, e.sha] for e in all_entries]
+                ).decode())
         return all_entries
 
-    async def fetch_file(self, owner: str, repo: str, path: str) -> str:
+    async def _fetch_tree_items(self, owner: str, repo: str, sha: str) -> list[dict]:
+        """Fetch one directory's raw Trees API items, by tree SHA.
+
+        Listings are cached by tree SHA (in memory, and on disk if a
+        DiskCache was given), so unchanged directories are free when a new
+        commit of the same repo is analyzed.
+        """
+        items = self._tree_items.get(sha)
+        if items is None and self._cache is not None:
+            cached = self._cache.get(f"subtree:{sha}")
+            if cached is not None:
+                items = orjson.loads(cached)
+                self._tree_items.set(sha, items)
+        if items is None:
+            response = await self._get(f"/repos/{owner}/{repo}/git/trees/{sha}")
+            # Keep only the fields _parse_tree reads (drops url, mode)
+            items = [
+                {key: item[key] for key in _TREE_ITEM_KEYS if key in item}
+                for item in orjson.loads(response.content).get("tree", [])
+            ]
+            self._tree_items.set(sha, items)
+            if self._cache is not None:
+                self._cache.set(f"subtree:{sha}", orjson.dumps(items).decode())
+        return items
+
+    async def fetch_file(
+        self, owner: str, repo: str, path: str, ref: str | None = None,
+    ) -> str:
         """Fetch the content of a single file from the repository.
 
-        Uses the Contents API which returns base64-encoded content.
+        Uses the Contents API with the raw media type, so the body is the
+        file itself rather than base64 wrapped in JSON.
 
         Args:
             owner: Repository owner.
             repo: Repository name.
             path: File path relative to repo root.
+            ref: Commit SHA or branch to read; defaults to the default branch.
 
         Returns:
             The file content as a UTF-8 string.
@@ -243,21 +444,155 @@ class GitHubClient:
         Raises:
             RepoNotFoundError, RateLimitError, GitHubError
         """
-        response = await self._http.get(
+        # Only SHA-pinned reads are persisted; branch reads may change
+        cache_key = f"file:{owner}/{repo}@{ref or 'HEAD'}:{path}"
+        persist = bool(ref and _COMMIT_SHA_PATTERN.match(ref))
+        cached = self._cache_get(cache_key, persist)
+        if cached is not None:
+            return cached
+
+        response = await self._get(
             f"/repos/{owner}/{repo}/contents/{path}",
+            params={"ref": ref} if ref else None,
+            headers=_RAW_HEADERS,
         )
-        self._check_response(response)
 
-        data = response.json()
-        if data.get("encoding") == "base64":
-            content_bytes = base64.b64decode(data["content"])
-            try:
-                return content_bytes.decode("utf-8")
-            except UnicodeDecodeError:
-                return "[binary file — content not displayable]"
+        content = _decode_raw(response.content)
+        self._cache_set(cache_key, content, persist)
+        return content
+
+    async def fetch_files(
+        self, owner: str, repo: str, paths: list[str], ref: str | None = None,
+    ) -> dict[str, str]:
+        """Fetch several files concurrently.
+
+        In-flight requests are bounded by the client-wide limit in _get, so
+        any number of paths can be passed at once. A file that fails (e.g.
+        a 404 for a path that doesn't exist) is logged and left out rather
+        than failing the batch.
+
+        Returns:
+            Mapping of path -> content for the files that were fetched,
+            in the order of paths.
+        """
+        results = await asyncio.gather(
+            *(self.fetch_file(owner, repo, path, ref=ref) for path in paths),
+            return_exceptions=True,
+        )
+
+        contents: dict[str, str] = {}
+        for path, result in zip(paths, results):
+            if isinstance(result, Exception):
+                log.warning("  ⚠️  Failed to fetch %s: %s", path, result)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                contents[path] = result
+        return contents
+
+    async def fetch_blob(self, owner: str, repo: str, sha: str) -> str:
+        """Fetch a file's content by its blob SHA (from a TreeEntry).
+
+        The Git Blobs API skips the path resolution the Contents API does,
+        and blob SHAs are content-addressed, so results are always cacheable.
+
+        Raises:
+            RepoNotFoundError, RateLimitError, GitHubError
+        """
+        cache_key = f"blob:{sha}"
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        response = await self._get(
+            f"/repos/{owner}/{repo}/git/blobs/{sha}", headers=_RAW_HEADERS,
+        )
+
+        content = _decode_raw(response.content)
+        self._cache_set(cache_key, content)
+        return content
+
+    def _cache_get(self, key: str, persist: bool = True) -> str | None:
+        """Look up a cached string in memory, then (if persist) on disk."""
+        value = self._memory.get(key)
+        if value is None and persist and self._cache is not None:
+            value = self._cache.get(key)
+            if value is not None:
+                self._memory.set(key, value)
+        return value
+
+    def _cache_set(
+        self, key: str, value: str, persist: bool = True, ttl: float | None = None,
+    ) -> None:
+        """Cache a string in memory and (if persist) on disk for ttl seconds."""
+        self._memory.set(key, value)
+        if persist and self._cache is not None:
+            self._cache.set(key, value, ttl)
+
+    async def _get_revalidated(
+        self, url: str, headers: dict[str, str] | None = None,
+    ) -> str:
+        """GET a response body, revalidating a previous copy with its ETag.
+
+        GitHub answers an unchanged resource with 304 Not Modified, which
+        doesn't count against the rate limit.
+        """
+        headers = dict(headers or {})
+        etag_key = f"{headers.get('Accept', '')} {url}"
+        cached = self._etags.get(etag_key)
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+
+        response = await self._get(url, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            return cached[1]
+
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etags.set(etag_key, (etag, response.text))
+        return response.text
+
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        """GET an API path, throttled and retried on rate-limit responses.
+
+        At most MAX_CONCURRENT_REQUESTS requests per token are in flight
+        at once. 403/429 responses are retried up to MAX_RETRIES times,
+        honoring Retry-After / X-RateLimit-Reset or backing off
+        exponentially with jitter. The semaphore is released while sleeping.
+
+        Requests also pause proactively when a token's last response
+        reported fewer than RATE_LIMIT_LOW_WATER calls left, rather than
+        spending the remainder and failing mid-scan.
+
+        Raises:
+            RepoNotFoundError, RateLimitError, GitHubError
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            session = self._next_session()
+            await session.wait_for_quota()
+            async with session.semaphore:
+                response = await session.http.get(url, **kwargs)
+            session.track_rate_limit(response)
+
+            if response.status_code not in (403, 429) or attempt == MAX_RETRIES:
+                break
+            delay = _retry_delay(response, attempt)
+            if delay is None:
+                break
+            log.warning("  ⏳ GitHub rate limited (%d), retrying in %.1fs",
+                        response.status_code, delay)
+            await asyncio.sleep(delay)
 
-        # Fallback: some files may have content directly
-        return data.get("content", "")
+        self._check_response(response)
+        return response
+
+    def _next_session(self) -> _Session:
+        """Pick the next token's session, skipping those nearly out of quota."""
+        for _ in range(len(self._sessions)):
+            session = next(self._rotation)
+            if not session.quota_low:
+                return session
+        return session
 
     def _check_response(self, response: httpx.Response) -> None:
         """Check for common GitHub API error responses.
@@ -287,3 +622,81 @@ class GitHubClient:
                 f"GitHub API error {response.status_code}: "
                 f"{response.text[:200]}"
             )
+
+
+def _parse_tree(
+    items: list[dict],
+    parent_path: str,
+    depth: int,
+    max_depth: int,
+) -> tuple[list[TreeEntry], list[tuple[str, str, int]]]:
+    """Parse one level of a Trees API response, applying skip filtering.
+
+    Args:
+        items: The response's "tree" list.
+        parent_path: Path of the directory being listed ("" for the root).
+        depth: Depth of the directory being listed (0 for the root).
+        max_depth: Maximum directory depth to expand.
+
+    Returns:
+        Tuple of (entries, subdirectories to expand as (sha, path, depth)).
+    """
+    from summary.tree import should_skip
+
+    tree_type = FileType.TREE
+    prefix = f"{parent_path}/" if parent_path else ""
+    expand = depth < max_depth
+
+    entries: list[TreeEntry] = []
+    subdirs: list[tuple[str, str, int]] = []
+    for item in items:
+        # Submodules ("commit") and anything unknown are skipped
+        type_ = _TYPE_MAP.get(item.get("type"))
+        if type_ is None:
+            continue
+        try:
+            entry = TreeEntry(prefix + item["path"], type_, item.get("size", 0), item["sha"])
+        except KeyError:
+            continue
+        if should_skip(entry):
+            continue
+        entries.append(entry)
+        if expand and type_ is tree_type:
+            subdirs.append((entry.sha, entry.path, depth + 1))
+    return entries, subdirs
+
+
+def _decode_raw(content: bytes) -> str:
+    """Decode a raw file body, or return a placeholder for binary files."""
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return "[binary file — content not displayable]"
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float | None:
+    """Seconds to wait before retrying a 403/429, or None to give up.
+
+    Prefers the server's Retry-After, then the primary limit's reset time,
+    and otherwise backs off exponentially with jitter. Waits longer than
+    MAX_RETRY_DELAY (e.g. an hourly quota that resets in 40 minutes) are
+    not worth blocking on, so those surface as RateLimitError instead.
+    """
+    headers = response.headers
+    if "Retry-After" in headers:
+        try:
+            delay = float(headers["Retry-After"])
+        except ValueError:
+            delay = 2 ** attempt
+    elif headers.get("X-RateLimit-Remaining") == "0" and "X-RateLimit-Reset" in headers:
+        try:
+            delay = max(0.0, float(headers["X-RateLimit-Reset"]) - time.time())
+        except ValueError:
+            delay = 2 ** attempt
+    elif response.status_code == 429 or "rate limit" in response.text.lower():
+        # Secondary rate limits don't always send Retry-After
+        delay = 2 ** attempt + random.random() * 0.1
+    else:
+        return None  # A plain 403 (e.g. forbidden resource) won't improve
+
+    return delay if delay <= MAX_RETRY_DELAY else None
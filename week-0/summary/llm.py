@@ -10,14 +10,26 @@ Provider implementations live in their own modules:
 
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
 import logging
 import os
+import re
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import tiktoken
+import orjson
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    import tiktoken
 
 log = logging.getLogger(__name__)
 
@@ -26,12 +38,101 @@ log = logging.getLogger(__name__)
 
 # Use cl100k_base (GPT-4 tokenizer) as a reasonable approximation
 # for all models. Not exact, but within ~15% for budget estimation.
-_ENCODER = tiktoken.get_encoding("cl100k_base")
+# Loading its BPE tables costs ~150 ms and ~20 MB, so it's deferred until
+# the first count (--readme-only runs never need it).
+@lru_cache(maxsize=None)
+def _get_encoder() -> tiktoken.Encoding:
+    import tiktoken
+
+    return tiktoken.get_encoding("cl100k_base")
+
+
+# SUMMARY_FAST_TOKENS=1 estimates counts as ~4 characters per token instead
+# of running the tokenizer. Much cheaper, but it undercounts code and
+# non-English text, so budgets may overshoot the model's context.
+FAST_TOKEN_ESTIMATE = os.environ.get("SUMMARY_FAST_TOKENS") == "1"
+
 
+def count_tokens_fast(text: str) -> int:
+    """Estimate token count from length alone (~4 characters per token)."""
+    return (len(text) + 3) // 4
 
+
+# Memoized: repeat analyses of the same repo (e.g. on the long-lived API
+# server) count the same tree text and file contents again. Hits cost a
+# dict lookup instead of a BPE pass; maxsize bounds the retained strings.
+@lru_cache(maxsize=256)
 def count_tokens(text: str) -> int:
     """Estimate token count for a text string."""
-    return len(_ENCODER.encode(text))
+    if FAST_TOKEN_ESTIMATE:
+        return count_tokens_fast(text)
+    return len(_get_encoder().encode_ordinary(text))
+
+
+def count_tokens_batch(texts: list[str]) -> list[int]:
+    """Count tokens for several texts in one call.
+
+    encode_ordinary_batch encodes on a thread pool with the GIL released,
+    which beats a count_tokens loop over many files. The trade-off is peak
+    memory: every text's token ids are held at once.
+    """
+    if FAST_TOKEN_ESTIMATE:
+        return [count_tokens_fast(text) for text in texts]
+    encoded = _get_encoder().encode_ordinary_batch(
+        texts, num_threads=os.cpu_count() or 4,
+    )
+    return [len(ids) for ids in encoded]
+
+
+def encode_tokens(text: str) -> list[int]:
+    """Tokenize text into token ids (same encoding as count_tokens).
+
+    Always loads the tokenizer, even with SUMMARY_FAST_TOKENS set.
+    """
+    return _get_encoder().encode_ordinary(text)
+
+
+def decode_tokens(tokens: list[int]) -> str:
+    """Turn token ids from encode_tokens back into text."""
+    return _get_encoder().decode(tokens)
+
+
+# ── Response parsing ─────────────────────────────────────────────────────
+
+# A closed fence, or else an unclosed one (output truncated mid-JSON)
+_FENCE_PATTERN = re.compile(
+    r"```(?:json)?\s*\n(.*?)```|```(?:json)?\s*\n(.*)", re.DOTALL,
+)
+
+
+def _close_truncated_json(fragment: str) -> str:
+    """Close the string, objects and arrays left open by truncated JSON.
+
+    A single scan tracks string/escape state and the stack of open
+    brackets, so quotes and braces inside strings aren't counted.
+    """
+    closers: list[str] = []
+    in_string = False
+    escaped = False
+    for ch in fragment:
+        if escaped:
+            escaped = False
+        elif in_string:
+            if ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            closers.append("}")
+        elif ch == "[":
+            closers.append("]")
+        elif ch in "}]" and closers:
+            closers.pop()
+
+    suffix = '"' if in_string else ""
+    return fragment + suffix + "".join(reversed(closers))
 
 
 # ── Prompt loading ───────────────────────────────────────────────────────
@@ -39,10 +140,131 @@ def count_tokens(text: str) -> int:
 _PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
 
 
+# Set SUMMARY_CACHE_PROMPTS=1 where prompts never change (e.g. a deployed
+# server) to skip even the stat() that picks up edits.
+CACHE_PROMPTS = os.environ.get("SUMMARY_CACHE_PROMPTS") == "1"
+
+
 def _load_prompt(name: str) -> str:
-    """Load a prompt template from the prompts/ directory."""
-    path = _PROMPTS_DIR / name
-    return path.read_text().strip()
+    """Load a prompt template from the prompts/ directory.
+
+    Templates are read once and reused until the file's mtime changes, so
+    edits still take effect without restarting the server.
+    """
+    if CACHE_PROMPTS:
+        return _read_prompt(name, 0.0)
+    return _read_prompt(name, (_PROMPTS_DIR / name).stat().st_mtime)
+
+
+@lru_cache(maxsize=32)
+def _read_prompt(name: str, mtime: float) -> str:
+    """Read a prompt template; mtime is only part of the cache key."""
+    return (_PROMPTS_DIR / name).read_text().strip()
+
+
+def _digest(*parts: str) -> str:
+    """SHA-256 over NUL-separated parts, for cache keys."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+# ── Concurrency ──────────────────────────────────────────────────────────
+
+# Provider tokens-per-minute caps to stay under, e.g. SUMMARY_INPUT_TPM=30000.
+# Unset or 0 means unlimited. Output can't be known up front, so each call
+# reserves OUTPUT_TOKEN_RESERVE and hands back what it didn't use.
+INPUT_TPM = int(os.environ.get("SUMMARY_INPUT_TPM") or 0)
+OUTPUT_TPM = int(os.environ.get("SUMMARY_OUTPUT_TPM") or 0)
+OUTPUT_TOKEN_RESERVE = 1_000
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that adapts AIMD-style to provider rate limits.
+
+    Use as ``async with limiter:`` around each request. Every success
+    raises the limit by 1/limit (about +1 per full window of requests) and
+    every rate-limit response halves it, so concurrent callers (e.g. the
+    server or a batch run) settle near the highest rate the provider
+    accepts.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 16) -> None:
+        self._limit = float(initial)
+        self._minimum = minimum
+        self._maximum = maximum
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return max(self._minimum, int(self._limit))
+
+    def on_success(self) -> None:
+        """Additive increase after a request succeeds."""
+        self._limit = min(self._maximum, self._limit + 1 / self._limit)
+
+    def on_rate_limit(self) -> None:
+        """Multiplicative decrease after a rate-limit response."""
+        self._limit = max(self._minimum, self._limit / 2)
+        log.debug("  🐢 Rate limited, concurrency now %d", self.limit)
+
+    async def __aenter__(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+
+class TokenBucket:
+    """Tokens-per-minute budget, for provider TPM caps.
+
+    The bucket holds up to one minute's worth of tokens and refills lazily
+    from the elapsed time on each acquire, so no background task is needed.
+    Callers acquire an estimate up front and settle() the difference once
+    the actual count is known.
+    """
+
+    def __init__(self, per_minute: int) -> None:
+        self._capacity = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    async def acquire(self, tokens: int) -> int:
+        """Wait until ``tokens`` are available, take them, and return the amount taken.
+
+        Requests larger than the bucket wait for a full bucket instead of
+        forever and take only that, so callers must settle() against the
+        returned amount rather than what they asked for. Waiters are served
+        in order.
+        """
+        tokens = min(tokens, int(self._capacity))
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self._rate)
+                self._refill()
+            self._tokens -= tokens
+        return tokens
+
+    def settle(self, delta: int) -> None:
+        """Return unused tokens (positive) or charge an overrun (negative)."""
+        self._refill()
+        self._tokens = min(self._capacity, self._tokens + delta)
 
 
 # ── Response models ──────────────────────────────────────────────────────
@@ -61,6 +283,18 @@ class TokenUsage:
             total_tokens=self.total_tokens + other.total_tokens,
         )
 
+    def add(self, other: TokenUsage) -> None:
+        """Accumulate ``other`` into this usage in place."""
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.total_tokens += other.total_tokens
+
+
+# Usage accumulators of the LLMClient.usage_scope() blocks currently open
+_usage_scopes: ContextVar[tuple[TokenUsage, ...]] = ContextVar(
+    "usage_scopes", default=(),
+)
+
 
 @dataclass
 class SummaryResult:
@@ -70,6 +304,13 @@ class SummaryResult:
     structure: str
 
 
+class SummarySchema(BaseModel):
+    """Response schema mirroring SummaryResult, for structured-output APIs."""
+    summary: str
+    technologies: list[str]
+    structure: str
+
+
 # ── Abstract base ────────────────────────────────────────────────────────
 
 class LLMClient(ABC):
@@ -80,12 +321,31 @@ class LLMClient(ABC):
     MAX_CONTEXT_TOKENS = 80_000
     MAX_FILE_TOKENS = 10_000
 
+    _model: str = ""
+
     def __init__(self) -> None:
         self.total_usage = TokenUsage()
+        self._input_bucket = TokenBucket(INPUT_TPM) if INPUT_TPM else None
+        self._output_bucket = TokenBucket(OUTPUT_TPM) if OUTPUT_TPM else None
+
+    @property
+    def model(self) -> str:
+        """Model identifier used for completions."""
+        return self._model
 
     @abstractmethod
-    async def complete(self, system: str, user: str) -> tuple[str, TokenUsage]:
-        """Send a chat completion request and return (response_text, usage)."""
+    async def complete(
+        self,
+        system: str,
+        user: str,
+        schema: type[BaseModel] | None = None,
+    ) -> tuple[str, TokenUsage]:
+        """Send a chat completion request and return (response_text, usage).
+
+        If ``schema`` is given, providers with structured-output support
+        constrain the response to JSON matching it; others ignore it and
+        rely on the prompt.
+        """
 
     async def pick_files(self, tree_text: str, token_budget: int) -> list[str]:
         """Ask the LLM which files to read based on the directory tree.
@@ -107,8 +367,7 @@ class LLMClient(ABC):
 
         user = f"Here is the directory tree with file sizes:\n\n{tree_text}"
 
-        response, usage = await self.complete(system, user)
-        self.total_usage = self.total_usage + usage
+        response, usage = await self._complete_throttled(system, user)
         log.debug("  file_picker raw response: %s", response[:300])
         log.debug("  file_picker usage: in=%d out=%d",
                   usage.input_tokens, usage.output_tokens)
@@ -125,13 +384,85 @@ class LLMClient(ABC):
         """
         system = _load_prompt("summarizer.md")
 
-        response, usage = await self.complete(system, context)
-        self.total_usage = self.total_usage + usage
+        response, usage = await self._complete_throttled(
+            system, context, schema=SummarySchema,
+        )
         log.debug("  summarizer raw response: %s", response[:500])
         log.debug("  summarizer usage: in=%d out=%d",
                   usage.input_tokens, usage.output_tokens)
         return self._parse_summary(response)
 
+    async def _complete_throttled(
+        self,
+        system: str,
+        user: str,
+        schema: type[BaseModel] | None = None,
+    ) -> tuple[str, TokenUsage]:
+        """complete(), held back by the input/output tokens-per-minute buckets.
+
+        Input is estimated from the prompt length and output reserved at
+        OUTPUT_TOKEN_RESERVE; both are settled against the reported usage.
+        A call larger than a bucket's capacity is charged the overrun after
+        it finishes, which holds back the calls that follow it.
+        """
+        input_estimate = count_tokens_fast(system) + count_tokens_fast(user)
+        input_taken = output_taken = 0
+        if self._input_bucket:
+            input_taken = await self._input_bucket.acquire(input_estimate)
+        if self._output_bucket:
+            output_taken = await self._output_bucket.acquire(OUTPUT_TOKEN_RESERVE)
+
+        usage = TokenUsage()
+        try:
+            response, usage = await self.complete(system, user, schema=schema)
+        finally:
+            # A failed request produced no output; its input still counts
+            if self._input_bucket and usage.input_tokens:
+                self._input_bucket.settle(input_taken - usage.input_tokens)
+            if self._output_bucket:
+                self._output_bucket.settle(output_taken - usage.output_tokens)
+        self._record_usage(usage)
+        return response, usage
+
+    @contextmanager
+    def usage_scope(self) -> Iterator[TokenUsage]:
+        """Collect the usage of LLM calls made within the block.
+
+        Scopes follow the current context, so concurrent analyses each see
+        only their own calls (including those in tasks they start), where
+        diffing total_usage would pick up the others'.
+        """
+        usage = TokenUsage()
+        token = _usage_scopes.set(_usage_scopes.get() + (usage,))
+        try:
+            yield usage
+        finally:
+            _usage_scopes.reset(token)
+
+    def _record_usage(self, usage: TokenUsage) -> None:
+        self.total_usage = self.total_usage + usage
+        for scope in _usage_scopes.get():
+            scope.add(usage)
+
+    def summary_cache_key(self, context: str) -> str:
+        """Return a hash identifying a summarize() call for this context.
+
+        Covers the summarizer prompt and model, so editing the prompt or
+        switching models invalidates previously cached summaries.
+        """
+        return _digest(_load_prompt("summarizer.md"), self.model, context)
+
+    def analysis_cache_key(self, url: str, sha: str) -> str:
+        """Return a hash identifying a full analysis of ``url`` at commit ``sha``.
+
+        Covers both prompts and the model, since the file picker decides
+        which files end up in the context.
+        """
+        return _digest(
+            _load_prompt("file_picker.md"), _load_prompt("summarizer.md"),
+            self.model, url, sha,
+        )
+
     @staticmethod
     def _parse_file_list(response: str) -> list[str]:
         """Extract a JSON list of file paths from the LLM response."""
@@ -144,10 +475,10 @@ class LLMClient(ABC):
             text = text.strip()
 
         try:
-            result = json.loads(text)
+            result = orjson.loads(text)
             if isinstance(result, list):
                 return [str(p) for p in result if isinstance(p, str)]
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             pass
 
         # Fallback: try to find a JSON array in the response
@@ -155,10 +486,10 @@ class LLMClient(ABC):
         end = text.rfind("]")
         if start != -1 and end != -1:
             try:
-                result = json.loads(text[start:end + 1])
+                result = orjson.loads(text[start:end + 1])
                 if isinstance(result, list):
                     return [str(p) for p in result if isinstance(p, str)]
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 pass
 
         return []
@@ -169,35 +500,25 @@ class LLMClient(ABC):
         text = response.strip()
 
         # Strip markdown code fences (may have preamble text before them)
-        import re
-        # Try closed fence first, then unclosed (truncated output)
-        fence_match = re.search(r"```(?:json)?\s*\n(.*?)```", text, re.DOTALL)
-        if not fence_match:
-            fence_match = re.search(r"```(?:json)?\s*\n(.*)", text, re.DOTALL)
+        fence_match = _FENCE_PATTERN.search(text)
         if fence_match:
-            text = fence_match.group(1).strip()
+            text = (fence_match.group(1) or fence_match.group(2) or "").strip()
 
         # Try direct JSON parse
         try:
-            data = json.loads(text)
-        except json.JSONDecodeError:
+            data = orjson.loads(text)
+        except orjson.JSONDecodeError:
             # Fallback: find JSON object in the text
             start = text.find("{")
             end = text.rfind("}")
             if start != -1 and end != -1 and end > start:
                 try:
-                    data = json.loads(text[start:end + 1])
-                except json.JSONDecodeError:
+                    data = orjson.loads(text[start:end + 1])
+                except orjson.JSONDecodeError:
                     # JSON may be truncated — try to repair
-                    fragment = text[start:]
-                    # Close any open strings and braces
-                    if fragment.count('"') % 2 == 1:
-                        fragment += '"'
-                    while fragment.count("{") > fragment.count("}"):
-                        fragment += "}"
                     try:
-                        data = json.loads(fragment)
-                    except json.JSONDecodeError:
+                        data = orjson.loads(_close_truncated_json(text[start:]))
+                    except orjson.JSONDecodeError:
                         raise ValueError(
                             f"Could not parse LLM response as JSON: {text[:200]}"
                         )
@@ -212,6 +533,18 @@ class LLMClient(ABC):
             structure=data.get("structure", ""),
         )
 
+    async def warmup(self) -> None:
+        """Pay one-time startup costs ahead of timed work. Never raises.
+
+        Loads the tokenizer; providers extend this to open their connection
+        with a request that costs no tokens.
+        """
+        if not FAST_TOKEN_ESTIMATE:
+            try:
+                await asyncio.to_thread(_get_encoder)
+            except Exception as e:  # Counting retries the load later
+                log.debug("Tokenizer warmup failed: %s", e)
+
     async def close(self) -> None:
         """Clean up resources. Override in subclasses if needed."""
 
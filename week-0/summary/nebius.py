@@ -2,9 +2,21 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
+import random
+from collections.abc import Mapping
 
-from summary.llm import LLMClient, TokenUsage
+from pydantic import BaseModel
+
+from summary.llm import AdaptiveLimiter, LLMClient, TokenUsage
+
+log = logging.getLogger(__name__)
+
+MAX_RETRIES = 4             # Retries on rate-limit / transient errors
+MAX_RETRY_DELAY = 60.0      # Cap on a single backoff sleep
+REQUEST_TIMEOUT = 120.0     # Seconds per completion request
 
 
 class NebiusLLMClient(LLMClient):
@@ -13,6 +25,9 @@ class NebiusLLMClient(LLMClient):
     Model: Llama-3.3-70B-Instruct — chosen for fast inference (120 tok/s),
     reliable structured JSON output, and no hidden <think> reasoning tokens
     (unlike Qwen3 models). See README.md for the full benchmark comparison.
+
+    Requests share an AdaptiveLimiter, so concurrent summaries back off
+    together when the provider starts returning 429s.
     """
 
     DEFAULT_BASE_URL = "https://api.tokenfactory.nebius.com/v1/"
@@ -27,21 +42,52 @@ class NebiusLLMClient(LLMClient):
         super().__init__()
         import openai
 
+        self._openai = openai
         self._model = model or self.DEFAULT_MODEL
+        # Retries are handled in complete() so rate limits reach the limiter
         self._client = openai.AsyncOpenAI(
             api_key=api_key or os.environ.get("NEBIUS_API_KEY", ""),
             base_url=base_url or self.DEFAULT_BASE_URL,
+            max_retries=0,
+            timeout=REQUEST_TIMEOUT,
         )
+        self._limiter = AdaptiveLimiter()
+
+    async def complete(
+        self,
+        system: str,
+        user: str,
+        schema: type[BaseModel] | None = None,
+    ) -> tuple[str, TokenUsage]:
+        # schema is ignored: the summarizer prompt already asks for JSON
+        openai = self._openai
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with self._limiter:
+                    response = await self._client.chat.completions.create(
+                        model=self._model,
+                        messages=[
+                            {"role": "system", "content": system},
+                            {"role": "user", "content": user},
+                        ],
+                        temperature=0.2,
+                    )
+                self._limiter.on_success()
+                break
+            except openai.RateLimitError as e:
+                self._limiter.on_rate_limit()
+                if attempt == MAX_RETRIES:
+                    raise
+                delay = _retry_after(e.response.headers) or 2 ** attempt
+            except (openai.APIConnectionError, openai.InternalServerError):
+                # APITimeoutError is an APIConnectionError
+                if attempt == MAX_RETRIES:
+                    raise
+                delay = 2 ** attempt
+            delay = min(MAX_RETRY_DELAY, delay) + random.random() * 0.5
+            log.warning("  ⏳ Nebius request failed, retrying in %.1fs", delay)
+            await asyncio.sleep(delay)
 
-    async def complete(self, system: str, user: str) -> tuple[str, TokenUsage]:
-        response = await self._client.chat.completions.create(
-            model=self._model,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            temperature=0.2,
-        )
         usage = TokenUsage()
         if response.usage:
             usage = TokenUsage(
@@ -51,5 +97,20 @@ class NebiusLLMClient(LLMClient):
             )
         return response.choices[0].message.content or "", usage
 
+    async def warmup(self) -> None:
+        await super().warmup()
+        try:
+            await self._client.models.list()
+        except self._openai.OpenAIError as e:
+            log.debug("Nebius warmup request failed: %s", e)
+
     async def close(self) -> None:
         await self._client.close()
+
+
+def _retry_after(headers: Mapping[str, str]) -> float | None:
+    """Seconds from a Retry-After header, if the response has one."""
+    try:
+        return float(headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
@@ -6,13 +6,14 @@ from the GitHub client.
 
 from __future__ import annotations
 
+from collections import Counter
 from dataclasses import dataclass
 
 from summary.github import FileType, TreeEntry
 
 # ── L1 well-known files (case-insensitive basenames) ──────────────────────
 
-L1_FILENAMES: set[str] = {
+L1_FILENAMES: frozenset[str] = frozenset({
     # Standard project files
     "readme.md",
     "readme.rst",
@@ -30,35 +31,35 @@ L1_FILENAMES: set[str] = {
     "llms.txt",
     "llms-full.txt",
     "context.md",
-}
+})
+
+
+# README variants first, then the rest alphabetically
+L1_CANONICAL_ORDER: tuple[str, ...] = tuple(
+    sorted(L1_FILENAMES, key=lambda name: (not name.startswith("readme"), name))
+)
 
 
 def find_l1_files(tree: list[TreeEntry]) -> list[TreeEntry]:
     """Find L1 (always-include) files in the tree.
 
     Matches well-known filenames at the repo root only (depth 0).
-    Returns them sorted by the canonical order above.
+    Returns them in L1_CANONICAL_ORDER.
     """
-    results = []
+    blob = FileType.BLOB
+    found: dict[str, list[TreeEntry]] = {}
     for entry in tree:
-        if entry.type != FileType.BLOB:
-            continue
-        if entry.depth == 0 and entry.name.lower() in L1_FILENAMES:
-            results.append(entry)
-
-    # Sort by canonical order: README first, then the rest alphabetically
-    def sort_key(e: TreeEntry) -> tuple[int, str]:
-        name = e.name.lower()
-        if name.startswith("readme"):
-            return (0, name)
-        return (1, name)
+        if entry.type is blob and entry.depth == 0:
+            name = entry.name_lower
+            if name in L1_FILENAMES:
+                found.setdefault(name, []).append(entry)
 
-    return sorted(results, key=sort_key)
+    return [entry for name in L1_CANONICAL_ORDER for entry in found.get(name, ())]
 
 
 # ── Skip patterns ────────────────────────────────────────────────────────
 
-SKIP_EXTENSIONS: set[str] = {
+SKIP_EXTENSIONS: frozenset[str] = frozenset({
     # Binary / media
     "png", "jpg", "jpeg", "gif", "bmp", "ico", "svg", "webp", "avif",
     "mp3", "mp4", "wav", "avi", "mov", "webm", "ogg", "flac",
@@ -73,9 +74,9 @@ SKIP_EXTENSIONS: set[str] = {
     "pdf", "doc", "docx", "xls", "xlsx",
     # Minified
     "min.js", "min.css",
-}
+})
 
-SKIP_DIRECTORIES: set[str] = {
+SKIP_DIRECTORIES: frozenset[str] = frozenset({
     "node_modules", "vendor", "__pycache__", ".git", ".svn", ".hg",
     "dist", "build", ".next", ".nuxt", ".output",
     ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
@@ -84,42 +85,34 @@ SKIP_DIRECTORIES: set[str] = {
     "target",       # Rust/Java build output
     "coverage",
     "site-packages",
-}
+})
 
-SKIP_FILENAMES: set[str] = {
+SKIP_FILENAMES: frozenset[str] = frozenset({
     "package-lock.json", "yarn.lock", "pnpm-lock.yaml",
     "poetry.lock", "cargo.lock", "gemfile.lock", "composer.lock",
     "go.sum",
-}
+})
 
 MAX_FILE_SIZE = 500_000  # 500 KB — files larger than this are likely not prose
 
 
 def should_skip(entry: TreeEntry) -> bool:
     """Check if a tree entry should be excluded from analysis."""
-    name_lower = entry.name.lower()
+    name_lower = entry.name_lower
 
-    # Skip known junk directories
-    if entry.type == FileType.TREE:
+    # Directories are only skipped by name, so check them first
+    if entry.type is FileType.TREE:
         return name_lower in SKIP_DIRECTORIES
 
-    # Skip by extension
-    if entry.extension in SKIP_EXTENSIONS:
-        return True
-
-    # Skip by filename
-    if name_lower in SKIP_FILENAMES:
-        return True
-
-    # Skip oversized files
-    if entry.size > MAX_FILE_SIZE:
+    if (
+        entry.extension in SKIP_EXTENSIONS
+        or name_lower in SKIP_FILENAMES
+        or entry.size > MAX_FILE_SIZE
+    ):
         return True
 
     # Skip hidden files (dotfiles), but not dotfile configs like .env.example
-    if name_lower.startswith(".") and "." not in name_lower[1:]:
-        return True
-
-    return False
+    return name_lower.startswith(".") and "." not in name_lower[1:]
 
 
 # ── Tree pruning ─────────────────────────────────────────────────────────
@@ -145,35 +138,19 @@ def prune_tree(
     if config is None:
         config = PruneConfig()
 
-    result = list(tree)
-    collapsed_dirs: set[str] = set()
-
-    # Step 1: Collapse directories with too many direct children
-    dir_child_counts: dict[str, int] = {}
-    for entry in result:
-        parent = entry.path.rsplit("/", 1)[0] if "/" in entry.path else ""
-        dir_child_counts[parent] = dir_child_counts.get(parent, 0) + 1
-
-    large_dirs: set[str] = {
-        d for d, count in dir_child_counts.items()
-        if count > config.max_children and d != ""
-    }
-
+    # Step 1: Drop children of directories with too many direct children
+    counts = Counter(entry.parent for entry in tree)
+    large_dirs = frozenset(
+        d for d, count in counts.items()
+        if count > config.max_children and d
+    )
     if large_dirs:
-        final: list[TreeEntry] = []
-        for entry in result:
-            parent = entry.path.rsplit("/", 1)[0] if "/" in entry.path else ""
-            if parent in large_dirs:
-                continue  # Skip children of oversized directories
-            final.append(entry)
-        collapsed_dirs.update(large_dirs)
-        result = final
+        result = [entry for entry in tree if entry.parent not in large_dirs]
+    else:
+        result = list(tree)
 
     # Step 2: Limit total entries
-    if len(result) > config.max_total_entries:
-        result = result[:config.max_total_entries]
-
-    return result
+    return result[:config.max_total_entries]
 
 
 # ── Tree formatting ──────────────────────────────────────────────────────
@@ -200,26 +177,27 @@ def format_tree(
     if collapsed_dirs is None:
         collapsed_dirs = set()
 
-    lines: list[str] = []
+    return "\n".join(_format_line(entry, collapsed_dirs) for entry in tree)
+
+
+def _format_line(entry: TreeEntry, collapsed_dirs: set[str]) -> str:
+    """Format one tree entry as its path, with a size or directory marker."""
+    if entry.type is FileType.TREE:
+        if entry.path in collapsed_dirs:
+            return f"{entry.path}/ [collapsed]"
+        return f"{entry.path}/"
+    return f"{entry.path} ({_format_size(entry.size)})"
 
-    for entry in tree:
-        if entry.type == FileType.TREE:
-            if entry.path in collapsed_dirs:
-                lines.append(f"{entry.path}/ [collapsed]")
-            else:
-                lines.append(f"{entry.path}/")
-        else:
-            size_str = _format_size(entry.size)
-            lines.append(f"{entry.path} ({size_str})")
 
-    return "\n".join(lines)
+_KB = 1 << 10
+_MB = 1 << 20
 
 
 def _format_size(size_bytes: int) -> str:
     """Format byte count as human-readable string."""
-    if size_bytes < 1024:
+    if size_bytes < _KB:
         return f"{size_bytes} B"
-    elif size_bytes < 1024 * 1024:
-        return f"{size_bytes / 1024:.1f} KB"
+    elif size_bytes < _MB:
+        return f"{size_bytes / _KB:.1f} KB"
     else:
-        return f"{size_bytes / (1024 * 1024):.1f} MB"
+        return f"{size_bytes / _MB:.1f} MB"
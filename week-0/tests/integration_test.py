@@ -4,10 +4,21 @@
 Usage:
     cd week-0
     source ../.env  # load API keys
-    python tests/integration_test.py [--provider google|nebius]
+    python tests/integration_test.py [--provider google|nebius] [--batch] [--resume]
+                                     [--no-cache]
 
 Reads repositories from testdata/repositories.txt, writes results to
-testdata/summaries.md.
+testdata/summaries.md. Each result is also checkpointed to
+testdata/summaries.jsonl as it completes; --resume skips repositories
+that already succeeded there.
+
+Results are cached in testdata/.cache by repository, HEAD commit, prompts
+and model, so rerunning against unchanged repositories skips the LLM
+entirely (--no-cache disables this).
+
+Repositories are analyzed concurrently, up to INTEGRATION_CONCURRENCY
+(default 4) at a time; set GITHUB_TOKENS to a comma-separated list to
+spread GitHub requests over several tokens.
 """
 
 from __future__ import annotations
@@ -16,148 +27,488 @@ import argparse
 import asyncio
 import os
 import sys
+from collections.abc import Awaitable
 from pathlib import Path
+from typing import BinaryIO, TypeVar
+
+import orjson
 
 # Add parent directory to path so we can import the summary package
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from summary.agent import AnalysisStats, RepoAnalyzer
 from summary.github import GitHubClient
-from summary.llm import create_llm_client
+from summary.llm import LLMClient, create_llm_client
 
 
 WEEK0_DIR = Path(__file__).resolve().parent.parent
 TESTDATA_DIR = WEEK0_DIR / "testdata"
 REPOS_FILE = TESTDATA_DIR / "repositories.txt"
 OUTPUT_FILE = TESTDATA_DIR / "summaries.md"
+CHECKPOINT_FILE = TESTDATA_DIR / "summaries.jsonl"  # One result per line
+CHECKPOINT_SCAN_SIZE = 1 << 16  # 64 KB read back at a time to find the last line
+RESULT_CACHE_DIR = TESTDATA_DIR / ".cache"
 
 DEFAULT_TOKEN_FILE = Path("~/.ssh/github_token").expanduser()
 
+DEFAULT_CONCURRENCY = 4
+PREFETCH_DEPTH = 2  # Gathered contexts queued ahead of the summarizers
+REPORT_BUFFER_SIZE = 1 << 20  # 1 MB
 
-def load_repos() -> list[str]:
-    """Load repository URLs from repositories.txt, skipping comments."""
-    lines = REPOS_FILE.read_text().strip().split("\n")
-    return [l.strip() for l in lines if l.strip() and not l.strip().startswith("#")]
+# Batch mode submits summaries in bins of similar context size, as
+# (upper bound in tokens, concurrent requests). Similar-sized requests batch
+# well together; the big ones get fewer slots so they don't hog the quota.
+SIZE_BINS: tuple[tuple[int | None, int], ...] = (
+    (2_000, 16),
+    (8_000, 8),
+    (32_000, 4),
+    (None, 2),
+)
 
+T = TypeVar("T")
 
-def load_github_token() -> str | None:
-    """Load GitHub token from env or default file."""
+
+def load_repos() -> list[str]:
+    """Load repository URLs from repositories.txt, skipping comments."""
+    with REPOS_FILE.open(encoding="utf-8") as fh:
+        return [s for s in (line.strip() for line in fh) if s and not s.startswith("#")]
+
+
+# Per-repo stats table, filled from AnalysisStats fields
+_STATS_TABLE = (
+    "| Metric | Value |\n"
+    "|--------|-------|\n"
+    "| Tree | {tree_entries_raw} → {tree_entries_pruned} entries ({tree_tokens:,} tok) |\n"
+    "| L1 files | {l1_files} files ({l1_tokens:,} tok) |\n"
+    "| L2 files | {l2_files_fetched}/{l2_files_requested} files ({l2_tokens:,} tok) |\n"
+    "| Context total | {total_tokens:,} / {budget:,} tok ({budget_used_pct:.1f}%) |\n"
+    "| LLM input | {llm_input_tokens:,} tok |\n"
+    "| LLM output | {llm_output_tokens:,} tok |\n"
+    "| LLM total | {llm_total_tokens:,} tok |\n"
+    "| Time | {elapsed_seconds:.1f}s |\n\n"
+).format
+
+
+def repo_name(url: str) -> str:
+    """Short "owner/repo" name for a GitHub URL."""
+    owner, repo = url.rstrip("/").rsplit("/", 2)[-2:]
+    return f"{owner}/{repo}"
+
+
+def load_checkpoint() -> dict[str, dict]:
+    """Load successful results from an earlier run's checkpoint, by URL.
+
+    Failed repos aren't reused, so --resume retries them. A line torn by a
+    crash mid-write is skipped with a warning.
+    """
+    if not CHECKPOINT_FILE.is_file():
+        return {}
+
+    results: dict[str, dict] = {}
+    with CHECKPOINT_FILE.open("rb") as fh:
+        for lineno, line in enumerate(fh, 1):
+            if not line.strip():
+                continue
+            try:
+                r = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                print(f"⚠️  Skipping malformed line {lineno} of {CHECKPOINT_FILE.name}")
+                continue
+            if r.get("status") == "ok":
+                r["stats"] = AnalysisStats(**r["stats"])
+                results[r["url"]] = r
+    return results
+
+
+def trim_torn_checkpoint() -> None:
+    """Cut a partial last line off the checkpoint before appending to it.
+
+    A run killed mid-write leaves a line without its newline; appending
+    straight onto it would corrupt the next record too.
+    """
+    if not CHECKPOINT_FILE.is_file():
+        return
+    with CHECKPOINT_FILE.open("r+b") as fh:
+        end = fh.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - CHECKPOINT_SCAN_SIZE)
+            fh.seek(start)
+            chunk = fh.read(pos - start)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                pos = start + newline + 1
+                break
+            pos = start
+        if pos < end:
+            fh.truncate(pos)
+            print(f"✂️  Dropped a partial last line from {CHECKPOINT_FILE.name}")
+
+
+class ResultCache:
+    """Finished results on disk, keyed by (URL, head commit, prompts + model).
+
+    An unchanged repository then costs one HEAD lookup and no LLM tokens on
+    reruns. Stats are stored with the result, so a hit reports the timings
+    and token counts of the run that produced it.
+    """
+
+    def __init__(
+        self, github: GitHubClient, llm: LLMClient, directory: Path = RESULT_CACHE_DIR,
+    ) -> None:
+        self._github = github
+        self._llm = llm
+        self._dir = directory
+        self._dir.mkdir(parents=True, exist_ok=True)
+
+    async def key(self, url: str) -> str:
+        """Cache key for ``url`` at its current default-branch HEAD."""
+        sha = await self._github.get_head_sha(*GitHubClient.parse_url(url))
+        return self._llm.analysis_cache_key(url, sha)
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached result for ``key``, or None on a miss."""
+        try:
+            r = orjson.loads((self._dir / f"{key}.json").read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return None
+        r["stats"] = AnalysisStats(**r["stats"])
+        return r
+
+    def set(self, key: str, result: dict) -> None:
+        """Store a successful result under ``key``."""
+        (self._dir / f"{key}.json").write_bytes(orjson.dumps(result))
+
+
+def load_concurrency() -> int:
+    """Read INTEGRATION_CONCURRENCY, which must be a positive integer."""
+    value = os.environ.get("INTEGRATION_CONCURRENCY", str(DEFAULT_CONCURRENCY))
+    try:
+        concurrency = int(value)
+    except ValueError:
+        concurrency = 0
+    if concurrency < 1:
+        raise SystemExit(f"INTEGRATION_CONCURRENCY must be a positive integer, got {value!r}")
+    return concurrency
+
+
+def load_github_tokens() -> list[str]:
+    """Load GitHub tokens from env or the default token file.
+
+    GITHUB_TOKENS (comma-separated) takes priority over GITHUB_TOKEN; the
+    client rotates requests across all of them.
+    """
+    tokens = [t.strip() for t in os.environ.get("GITHUB_TOKENS", "").split(",")]
+    tokens = [t for t in tokens if t]
+    if tokens:
+        return tokens
     token = os.environ.get("GITHUB_TOKEN")
     if token:
-        return token
+        return [token]
     if DEFAULT_TOKEN_FILE.is_file():
-        return DEFAULT_TOKEN_FILE.read_text().strip()
-    return None
-
-
-def write_report(results: list[dict], output: Path) -> None:
-    """Write batch results to a markdown summary file."""
-    lines = ["# Integration Test Results\n"]
-
-    ok = sum(1 for r in results if r["status"] == "ok")
-    lines.append(f"**{ok}/{len(results)}** repositories summarized successfully.\n")
-
+        return [DEFAULT_TOKEN_FILE.read_text().strip()]
+    return []
+
+
+def write_report(results: list[dict], ok: int, output: Path) -> None:
+    """Write batch results to a markdown summary file.
+
+    ``ok`` is the number of successful results, counted by the caller while
+    it collects them. Sections are streamed through a 1 MB write buffer
+    rather than joined into one string, so memory stays flat however many
+    repos are reported.
+    """
+    with output.open("w", encoding="utf-8", buffering=REPORT_BUFFER_SIZE) as fh:
+        fh.write("# Integration Test Results\n\n")
+        fh.write(f"**{ok}/{len(results)}** repositories summarized successfully.\n\n")
+
+        for r in results:
+            fh.write("---\n\n")
+            fh.write(f"## [{r['repo_name']}]({r['url']})\n\n")
+
+            if r["status"] == "error":
+                fh.write(f"**❌ Error**: {r['error']}\n\n")
+                continue
+
+            stats: AnalysisStats = r["stats"]
+            fh.write(_STATS_TABLE(**vars(stats), budget_used_pct=stats.budget_used_pct))
+            fh.write(f"\n### Summary\n\n{r['summary']}\n\n")
+            fh.write(f"\n### Technologies\n\n{', '.join(r['technologies'])}\n\n")
+            fh.write(f"\n### Structure\n\n{r['structure']}\n\n")
+
+
+async def gather_one(
+    analyzer: RepoAnalyzer, url: str, label: str, cache: ResultCache | None,
+) -> dict:
+    """Build one repository's context; returns an error dict on failure.
+
+    On a result cache hit the finished result is returned instead.
+    """
+    print(f"{label} ▶️  {url}")
+    name = repo_name(url)
+    try:
+        key = await cache.key(url) if cache else None
+        if key and (cached := cache.get(key)) is not None:
+            print(f"{label} 💾 {url} (cached)")
+            return cached
+        ctx, stats = await analyzer.gather_context(url)
+    except Exception as e:
+        return _error_result(url, name, label, e)
+    return {
+        "url": url,
+        "repo_name": name,
+        "label": label,
+        "status": "context",
+        "ctx": ctx,
+        "stats": stats,
+        "cache_key": key,
+    }
+
+
+async def summarize_one(
+    analyzer: RepoAnalyzer,
+    prepared: dict,
+    checkpoint: BinaryIO,
+    cache: ResultCache | None,
+) -> dict:
+    """Summarize a context from gather_one() into a result dict (never raises).
+
+    Every result, including errors, is appended to the checkpoint as soon
+    as it's known.
+    """
+    result = await _summarize_prepared(analyzer, prepared)
+    if cache and result["status"] == "ok" and prepared.get("cache_key"):
+        cache.set(prepared["cache_key"], result)
+    _write_checkpoint(checkpoint, result)
+    return result
+
+
+def _write_checkpoint(checkpoint: BinaryIO, result: dict) -> None:
+    checkpoint.write(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
+    checkpoint.flush()
+
+
+async def _summarize_prepared(analyzer: RepoAnalyzer, prepared: dict) -> dict:
+    if prepared["status"] != "context":
+        return prepared
+
+    url, name, label = prepared["url"], prepared["repo_name"], prepared["label"]
+    try:
+        result = await analyzer.summarize_context(prepared["ctx"], prepared["stats"])
+    except Exception as e:
+        return _error_result(url, name, label, e)
+
+    print(f"{label} ✅ {url}")
+    return {
+        "url": url,
+        "repo_name": name,
+        "status": "ok",
+        "summary": result.summary,
+        "technologies": result.technologies,
+        "structure": result.structure,
+        "stats": prepared["stats"],
+    }
+
+
+def _error_result(url: str, name: str, label: str, error: Exception) -> dict:
+    print(f"{label} ❌ {url}: {error}")
+    return {
+        "url": url,
+        "repo_name": name,
+        "status": "error",
+        "error": str(error),
+    }
+
+
+def _size_bins(prepared: list[dict]) -> list[list[int]]:
+    """Group indices of gathered contexts into SIZE_BINS by context tokens."""
+    bins: list[list[int]] = [[] for _ in SIZE_BINS]
+    for i, p in enumerate(prepared):
+        if p["status"] != "context":
+            continue
+        tokens = p["stats"].total_tokens
+        for b, (limit, _) in enumerate(SIZE_BINS):
+            if limit is None or tokens < limit:
+                bins[b].append(i)
+                break
+    return bins
+
+
+async def _bounded(semaphore: asyncio.Semaphore, coro: Awaitable[T]) -> T:
+    async with semaphore:
+        return await coro
+
+
+async def _run_pending(
+    analyzer: RepoAnalyzer,
+    pending: list[tuple[str, str]],
+    concurrency: int,
+    batch: bool,
+    checkpoint: BinaryIO,
+    cache: ResultCache | None,
+) -> list[dict]:
+    """Analyze (url, label) pairs, in batch mode or pipelined."""
+    if not batch:
+        return await _run_pipelined(analyzer, pending, concurrency, checkpoint, cache)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    # Build every context first (GitHub-bound), then submit the
+    # summaries bin by bin so the provider can batch them server-side.
+    prepared = await asyncio.gather(*(
+        _bounded(semaphore, gather_one(analyzer, url, label, cache))
+        for url, label in pending
+    ))
+    results: list[dict] = list(prepared)
+    # Cache hits and gather errors are final already
     for r in results:
-        url = r["url"]
-        parts = url.rstrip("/").split("/")
-        repo_name = f"{parts[-2]}/{parts[-1]}"
-
-        lines.append("---\n")
-        lines.append(f"## [{repo_name}]({url})\n")
-
-        if r["status"] == "error":
-            lines.append(f"**❌ Error**: {r['error']}\n")
+        if r["status"] != "context":
+            _write_checkpoint(checkpoint, r)
+    for (limit, bin_concurrency), indices in zip(SIZE_BINS, _size_bins(prepared)):
+        if not indices:
             continue
-
-        stats: AnalysisStats = r["stats"]
-        lines.append(
-            f"| Metric | Value |\n"
-            f"|--------|-------|\n"
-            f"| Tree | {stats.tree_entries_raw} → {stats.tree_entries_pruned} entries ({stats.tree_tokens:,} tok) |\n"
-            f"| L1 files | {stats.l1_files} files ({stats.l1_tokens:,} tok) |\n"
-            f"| L2 files | {stats.l2_files_fetched}/{stats.l2_files_requested} files ({stats.l2_tokens:,} tok) |\n"
-            f"| Context total | {stats.total_tokens:,} / {stats.budget:,} tok ({stats.budget_used_pct:.1f}%) |\n"
-            f"| LLM input | {stats.llm_input_tokens:,} tok |\n"
-            f"| LLM output | {stats.llm_output_tokens:,} tok |\n"
-            f"| LLM total | {stats.llm_total_tokens:,} tok |\n"
-            f"| Time | {stats.elapsed_seconds:.1f}s |\n"
-        )
-        lines.append(f"\n### Summary\n\n{r['summary']}\n")
-        lines.append(f"\n### Technologies\n\n{', '.join(r['technologies'])}\n")
-        lines.append(f"\n### Structure\n\n{r['structure']}\n")
-
-    output.write_text("\n".join(lines))
-
-
-async def run(provider: str | None) -> None:
+        bound = f"< {limit:,}" if limit else "largest"
+        print(f"📦 Submitting {len(indices)} summaries "
+              f"({bound} tok, {bin_concurrency} at a time)")
+        bin_semaphore = asyncio.Semaphore(bin_concurrency)
+        summarized = await asyncio.gather(*(
+            _bounded(bin_semaphore, summarize_one(analyzer, prepared[i], checkpoint, cache))
+            for i in indices
+        ))
+        for i, result in zip(indices, summarized):
+            results[i] = result
+    return results
+
+
+async def _run_pipelined(
+    analyzer: RepoAnalyzer,
+    pending: list[tuple[str, str]],
+    concurrency: int,
+    checkpoint: BinaryIO,
+    cache: ResultCache | None,
+) -> list[dict]:
+    """Gather contexts ahead of the summarizers through a bounded queue.
+
+    GitHub fetches and LLM calls use disjoint resources, so the next repos'
+    contexts are built while earlier ones are being summarized. A gatherer
+    holds its slot until its context is queued, so gathering stalls rather
+    than running ahead once PREFETCH_DEPTH contexts are waiting.
+    """
+    queue: asyncio.Queue[tuple[int, dict] | None] = asyncio.Queue(PREFETCH_DEPTH)
+    semaphore = asyncio.Semaphore(concurrency)
+    results: list[dict] = [{}] * len(pending)
+
+    async def produce(i: int, url: str, label: str) -> None:
+        async with semaphore:
+            await queue.put((i, await gather_one(analyzer, url, label, cache)))
+
+    async def produce_all() -> None:
+        await asyncio.gather(*(
+            produce(i, url, label) for i, (url, label) in enumerate(pending)
+        ))
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def consume() -> None:
+        while (item := await queue.get()) is not None:
+            i, prepared = item
+            results[i] = await summarize_one(analyzer, prepared, checkpoint, cache)
+
+    await asyncio.gather(produce_all(), *(consume() for _ in range(concurrency)))
+    return results
+
+
+async def run(
+    provider: str | None,
+    batch: bool = False,
+    resume: bool = False,
+    use_cache: bool = True,
+) -> None:
+    concurrency = load_concurrency()
     repos = load_repos()
     print(f"📋 Integration test: {len(repos)} repositories")
 
-    token = load_github_token()
-    if token:
-        print("🔑 Using GitHub token")
+    if resume:
+        trim_torn_checkpoint()
+    done = load_checkpoint() if resume else {}
+    if done:
+        print(f"⏭️  Reusing {len(done)} results from {CHECKPOINT_FILE.name}")
+
+    tokens = load_github_tokens()
+    if tokens:
+        print(f"🔑 Using {len(tokens)} GitHub token(s)")
     else:
         print("🔓 No GitHub token (60 req/hr)")
 
-    github = GitHubClient(token=token)
+    github = GitHubClient(tokens=tokens)
     llm = create_llm_client(provider=provider)
     analyzer = RepoAnalyzer(github=github, llm=llm)
-
-    results: list[dict] = []
-
-    for i, url in enumerate(repos, 1):
-        print(f"\n{'═' * 60}")
-        print(f"[{i}/{len(repos)}] {url}")
-        print(f"{'═' * 60}")
-
-        try:
-            result, stats = await analyzer.analyze(url)
-            results.append({
-                "url": url,
-                "status": "ok",
-                "summary": result.summary,
-                "technologies": result.technologies,
-                "structure": result.structure,
-                "stats": stats,
-            })
-            print(f"  ✅ Done")
-        except Exception as e:
-            results.append({
-                "url": url,
-                "status": "error",
-                "error": str(e),
-            })
-            print(f"  ❌ Error: {e}")
-
-        # Reset LLM usage for next repo
-        llm.total_usage = type(llm.total_usage)()
+    cache = ResultCache(github, llm) if use_cache else None
+
+    # Connection setup and tokenizer loading would otherwise land on
+    # whichever repos start first and skew their timings
+    print("🔥 Warming up GitHub and LLM clients")
+    await asyncio.gather(github.warmup(), llm.warmup())
+
+    print(f"⚡ Concurrency: {concurrency}")
+
+    pending = [
+        (url, f"[{i}/{len(repos)}]")
+        for i, url in enumerate(repos, 1)
+        if url not in done
+    ]
+    with CHECKPOINT_FILE.open("ab" if resume else "wb") as checkpoint:
+        results = await _run_pending(
+            analyzer, pending, concurrency, batch, checkpoint, cache,
+        )
 
     await github.close()
     await llm.close()
 
-    write_report(results, OUTPUT_FILE)
-    print(f"\n📝 Results → {OUTPUT_FILE}")
-
-    # Summary table
-    print(f"\n{'═' * 60}")
-    print("📊 Summary")
-    print(f"{'═' * 60}")
-    for r in results:
-        parts = r["url"].rstrip("/").split("/")
-        name = f"{parts[-2]}/{parts[-1]}"
+    # One pass in input order, previous runs' results included: collect
+    # the report's results, count successes and build the summary table,
+    # which is written in one go rather than a print() per line
+    done.update((r["url"], r) for r in results)
+    results = []
+    ok = 0
+    lines = ["", "═" * 60, "📊 Summary", "═" * 60]
+    for url in repos:
+        r = done[url]
+        results.append(r)
+        name = r["repo_name"]
         if r["status"] == "ok":
+            ok += 1
             s = r["stats"]
-            print(f"  ✅ {name:<35} {s.total_tokens:>6,} ctx tok | "
-                  f"{s.llm_total_tokens:>6,} llm tok | {s.elapsed_seconds:.1f}s")
+            lines.append(f"  ✅ {name:<35} {s.total_tokens:>6,} ctx tok | "
+                         f"{s.llm_total_tokens:>6,} llm tok | {s.elapsed_seconds:.1f}s")
         else:
-            print(f"  ❌ {name:<35} {r['error'][:40]}")
+            lines.append(f"  ❌ {name:<35} {r['error'][:40]}")
+    lines.append("")
+
+    write_report(results, ok, OUTPUT_FILE)
+    print(f"\n📝 Results → {OUTPUT_FILE}")
+    sys.stdout.write("\n".join(lines))
 
 
 def main():
     parser = argparse.ArgumentParser(description="Integration test for repo summarizer")
     parser.add_argument("--provider", choices=["nebius", "google"], default=None)
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Gather all contexts first, then submit every summary together",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse successful results from testdata/summaries.jsonl",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-analyze every repo instead of reusing testdata/.cache results",
+    )
     args = parser.parse_args()
-    asyncio.run(run(args.provider))
+    asyncio.run(run(args.provider, args.batch, args.resume, not args.no_cache))
 
 
 if __name__ == "__main__":